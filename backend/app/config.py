@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     MYSQL_DATABASE: str = "ecoa"
     DATABASE_URL: Optional[str] = None
 
+    # Async connection pool (API requests)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600
+
     @property
     def mysql_url(self) -> str:
         if self.DATABASE_URL:
@@ -35,11 +41,89 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Password hashing (bcrypt cost factor and dedicated thread pool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Auth cache (decoded tokens and active users, per process)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
     # Redis (for Celery)
     REDIS_URL: str = "redis://localhost:6379/0"
 
-    # Scraping
+    # Scraping (SCRAPE_INTERVAL_MINUTES applies to terms monitored only by FREE users)
     SCRAPE_INTERVAL_MINUTES: int = 30
+    PRO_SCRAPE_INTERVAL_MINUTES: int = 10
+    # Article fetches per scraping job, shared by (source, term) according to
+    # recent yield; pairs listing nothing new are backed off exponentially
+    SCRAPE_FETCH_BUDGET: int = 200
+    SCRAPE_MAX_FETCHES_PER_PAIR: int = 20
+    SCRAPE_CONCURRENCY: int = 4
+    # Worker processes per Celery queue (each queue has its own worker)
+    SCRAPE_PRO_CONCURRENCY: int = 4
+    SCRAPE_FREE_CONCURRENCY: int = 2
+    SCRAPE_BACKFILL_CONCURRENCY: int = 1
+    CRAWL_BACKOFF_BASE_MINUTES: int = 30
+    CRAWL_BACKOFF_MAX_MINUTES: int = 24 * 60
+    # A running job heartbeats its checkpoint; one silent for the lease is
+    # taken over and resumed (redeliveries of the same task resume at once)
+    SCRAPE_JOB_HEARTBEAT_SECONDS: int = 30
+    SCRAPE_JOB_LEASE_SECONDS: int = 120
+    SCRAPE_JOB_HISTORY_DAYS: int = 7
+
+    # Raw article HTML, compressed ("gzip", or "zstd" with zstandard installed)
+    # and kept for re-parsing with scripts.reparse
+    RAW_HTML_ENABLED: bool = True
+    RAW_HTML_STORE_DIR: str = "data/raw_html"
+    RAW_HTML_CODEC: str = "gzip"
+    RAW_HTML_RETENTION_DAYS: int = 90
+
+    # On-disk HTTP cache under the scrapers' fetch_page. Pages younger than
+    # their source's TTL are reused as is; older ones are revalidated (304)
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_DIR: str = "data/http_cache"
+    HTTP_CACHE_MAX_MB: int = 500
+    HTTP_CACHE_TTL_SECONDS: dict[str, int] = {"default": 0, "g1": 120, "cnn": 120}
+
+    # Fetch resilience, per host and per job. Timeouts adapt to the host's p95
+    # latency; transient errors are retried with jittered backoff, and a host
+    # where FETCH_CIRCUIT_FAILURES URLs in a row failed all their retries is
+    # skipped until the next job
+    FETCH_TIMEOUT_SECONDS: float = 30.0
+    FETCH_TIMEOUT_MIN_SECONDS: float = 3.0
+    FETCH_TIMEOUT_P95_MULTIPLIER: float = 3.0
+    FETCH_RETRIES: int = 2
+    FETCH_RETRY_BASE_SECONDS: float = 0.5
+    FETCH_CIRCUIT_FAILURES: int = 5
+    # News rows scanned per chunk when matching a new or renamed term
+    BACKFILL_CHUNK_SIZE: int = 1000
+    # Window in which newly added terms are batched into one immediate scrape
+    ON_DEMAND_SCRAPE_DEBOUNCE_SECONDS: int = 20
+    # Deep crawl of older search result pages for new terms (backfill queue)
+    DEEP_CRAWL_MAX_PAGES: int = 10
+    DEEP_CRAWL_DAYS: int = 90
+    DEEP_CRAWL_CONCURRENCY: int = 4
+
+    # Response cache ("redis" or "memory"). Scraping runs in Celery workers,
+    # whose invalidations only reach the API through redis; "memory" is for
+    # a single process (e.g. /scrape/trigger in development), and workers
+    # refuse to start with it.
+    CACHE_BACKEND: str = "redis"
+    CACHE_MEMORY_MAX_ENTRIES: int = 1024
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60
+    DASHBOARD_CACHE_STALE_SECONDS: int = 600
+
+    # /news/changes only hands out matches older than this. Their created_at
+    # is set before the transaction commits, so a row committed late must
+    # still sort after every cursor already returned
+    CHANGES_SETTLE_SECONDS: int = 10
+
+    # Live push of new matches ("redis" or "memory", same trade-off as the cache)
+    EVENTS_BACKEND: str = "redis"
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+    # Lifetime of the stream-only tokens passed to /events/stream?token=
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
 
     # Plan limits
     FREE_PLAN_TERM_LIMIT: int = 3
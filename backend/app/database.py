@@ -15,7 +15,10 @@ engine = create_engine(
 async_engine = create_async_engine(
     settings.async_mysql_url,
     pool_pre_ping=True,
-    pool_recycle=3600,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
     echo=settings.DEBUG
 )
 
@@ -4,7 +4,7 @@ from contextlib import asynccontextmanager
 import logging
 
 from .config import settings
-from .routers import auth, news, filters, dashboard
+from .routers import auth, news, filters, dashboard, events
 
 # Configure logging
 logging.basicConfig(
@@ -65,6 +65,7 @@ app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(news.router, prefix=settings.API_V1_PREFIX)
 app.include_router(filters.router, prefix=settings.API_V1_PREFIX)
 app.include_router(dashboard.router, prefix=settings.API_V1_PREFIX)
+app.include_router(events.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
@@ -2,6 +2,7 @@ from .user import User, PlanType
 from .news import News, NewsSource, SentimentType
 from .term import MonitoredTerm, NewsTermMatch
 from .alert import Alert, AlertType
+from .crawl import CrawlStat, ScrapeJob, ScrapeJobStatus
 
 __all__ = [
     "User",
@@ -12,5 +13,8 @@ __all__ = [
     "MonitoredTerm",
     "NewsTermMatch",
     "Alert",
-    "AlertType"
+    "AlertType",
+    "CrawlStat",
+    "ScrapeJob",
+    "ScrapeJobStatus"
 ]
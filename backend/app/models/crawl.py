@@ -0,0 +1,64 @@
+from sqlalchemy import Column, String, DateTime, Integer, Float, Enum, JSON, UniqueConstraint, Index
+from datetime import datetime
+import uuid
+import enum
+
+from ..database import Base
+
+
+class CrawlStat(Base):
+    """New-article yield of one (source, term) pair, used to budget the crawl"""
+    __tablename__ = "ecoa_crawl_stats"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    source = Column(String(50), nullable=False)
+    term = Column(String(255), nullable=False)
+    yield_avg = Column(Float, nullable=False, default=0.0)  # moving average of new URLs per run
+    last_new_count = Column(Integer, nullable=False, default=0)
+    quiet_runs = Column(Integer, nullable=False, default=0)  # consecutive runs without new URLs
+    last_crawled_at = Column(DateTime, nullable=True)
+    next_crawl_at = Column(DateTime, nullable=True)  # set while the pair is backed off
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('source', 'term', name='uq_crawl_source_term'),
+    )
+
+    def __repr__(self):
+        return f"<CrawlStat {self.source}:{self.term}>"
+
+
+class ScrapeJobStatus(str, enum.Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+
+class ScrapeJob(Base):
+    """Checkpoint of a scraping job, so a killed or retried job can resume"""
+    __tablename__ = "ecoa_scrape_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_key = Column(String(50), nullable=False)  # e.g. "plan:pro"
+    # job_key while running, NULL once completed: the unique index allows a
+    # single running job per key
+    running_key = Column(String(50), nullable=True)
+    status = Column(Enum(ScrapeJobStatus), nullable=False, default=ScrapeJobStatus.RUNNING)
+    # Lease: the run holding the job (Celery task id) and its last heartbeat
+    owner = Column(String(155), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    done_units = Column(JSON, nullable=False, default=list)  # "source:term" pairs already crawled
+    pending_articles = Column(JSON, nullable=False, default=list)  # fetched but not yet stored
+    articles_found = Column(Integer, nullable=False, default=0)
+    articles_stored = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=1)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_scrape_job_key_status', 'job_key', 'status'),
+        UniqueConstraint('running_key', name='uq_scrape_job_running_key'),
+    )
+
+    def __repr__(self):
+        return f"<ScrapeJob {self.job_key} {self.status}>"
@@ -45,10 +45,11 @@ class News(Base):
     scraped_at = Column(DateTime, default=datetime.utcnow)
     sentiment = Column(Enum(SentimentType), nullable=True, index=True)
     sentiment_score = Column(Float, nullable=True)
+    raw_html_hash = Column(String(64), nullable=True)  # digest in the raw HTML store
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
-    term_matches = relationship("NewsTermMatch", back_populates="news", cascade="all, delete-orphan")
+    term_matches = relationship("NewsTermMatch", back_populates="news", cascade="all, delete-orphan", passive_deletes=True)
     alerts = relationship("Alert", back_populates="news")
 
     # Indexes
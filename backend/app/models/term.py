@@ -13,13 +13,19 @@ class MonitoredTerm(Base):
     user_id = Column(String(36), ForeignKey("ecoa_users.id", ondelete="CASCADE"), nullable=False, index=True)
     term = Column(String(255), nullable=False, index=True)
     is_active = Column(Boolean, default=True)
+    # Denormalized from ecoa_news_term_matches; bumped by ingestion and
+    # repaired by NewsProcessor.reconcile_term_counters
+    match_total = Column(Integer, nullable=False, default=0, server_default="0")
+    last_matched_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user = relationship("User", back_populates="monitored_terms")
-    news_matches = relationship("NewsTermMatch", back_populates="term", cascade="all, delete-orphan")
-    alerts = relationship("Alert", back_populates="term", cascade="all, delete-orphan")
+    # passive_deletes: rows are removed by the FKs' ON DELETE clauses instead
+    # of being loaded into the session first
+    news_matches = relationship("NewsTermMatch", back_populates="term", cascade="all, delete-orphan", passive_deletes=True)
+    alerts = relationship("Alert", back_populates="term", cascade="all, delete-orphan", passive_deletes=True)
 
     # Unique constraint
     __table_args__ = (
@@ -47,6 +53,7 @@ class NewsTermMatch(Base):
     # Unique constraint
     __table_args__ = (
         UniqueConstraint('news_id', 'term_id', name='uq_news_term'),
+        Index('idx_match_term_created', 'term_id', 'created_at'),
     )
 
     def __repr__(self):
@@ -0,0 +1,19 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    Handlers on hot paths build plain dicts from rows and return this
+    response directly, which skips per-item Pydantic models and the
+    default JSON encoder. The route's response_model still documents the
+    payload shape.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -1,21 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from datetime import timedelta
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import User, PlanType
 from ..services.auth import (
-    get_password_hash,
+    get_password_hash_async,
     create_access_token,
     authenticate_user,
-    get_current_user
+    get_current_user,
+    invalidate_user_cache
 )
 from ..schemas.user import (
     UserCreate,
     UserLogin,
     UserUpdate,
     UserResponse,
-    TokenResponse
+    TokenResponse,
+    CurrentUser
 )
 from ..config import settings
 
@@ -23,14 +26,15 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=TokenResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_user = result.scalar_one_or_none()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email já cadastrado")
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -44,8 +48,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     # Generate JWT token
     access_token = create_access_token(
@@ -69,8 +73,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, credentials.email, credentials.password)
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, credentials.email, credentials.password)
 
     if not user:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
@@ -97,13 +101,13 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(current_user: CurrentUser = Depends(get_current_user)):
     # JWT é stateless, então logout é feito no cliente removendo o token
     return {"message": "Logout realizado com sucesso"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: CurrentUser = Depends(get_current_user)):
     return UserResponse(
         id=current_user.id,
         email=current_user.email,
@@ -120,25 +124,29 @@ async def get_me(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserResponse)
 async def update_me(
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     update_data = user_data.model_dump(exclude_unset=True)
 
+    # The cached projection is read-only; update the row itself
+    user = await db.get(User, current_user.id)
+
     for key, value in update_data.items():
-        setattr(current_user, key, value)
+        setattr(user, key, value)
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user_cache(user.id)
 
     return UserResponse(
-        id=current_user.id,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        political_name=current_user.political_name,
-        party=current_user.party,
-        state=current_user.state,
-        avatar_url=current_user.avatar_url,
-        plan_type=current_user.plan_type.value,
-        created_at=current_user.created_at
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        political_name=user.political_name,
+        party=user.party,
+        state=user.state,
+        avatar_url=user.avatar_url,
+        plan_type=user.plan_type.value,
+        created_at=user.created_at
     )
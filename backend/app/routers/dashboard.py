@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends
-from datetime import datetime, timedelta
+import asyncio
+from fastapi import APIRouter, Depends, Request
+from datetime import datetime, timedelta, date
 from collections import defaultdict
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select, func, case
 
-from ..database import get_db
-from ..models import User, News, MonitoredTerm, SentimentType
+from ..database import AsyncSessionLocal
+from ..responses import FastJSONResponse
+from ..models import News, MonitoredTerm, SentimentType
 from ..services.auth import get_current_user
+from ..services.cache import response_cache
+from ..services.conditional import build_validator
+from ..schemas.user import CurrentUser
 from ..schemas.dashboard import (
     StatsResponse,
     TrendResponse,
@@ -17,13 +21,18 @@ from ..schemas.dashboard import (
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# Each section below opens its own AsyncSession, so the dashboard can run
+# them concurrently (a single session cannot be shared between coroutines).
 
-def get_user_terms(db: Session, user_id: str, active_only: bool = True):
+
+async def get_user_terms(user_id: str, active_only: bool = True) -> list:
     """Get user's monitored terms"""
-    query = db.query(MonitoredTerm).filter(MonitoredTerm.user_id == user_id)
+    query = select(MonitoredTerm.term).where(MonitoredTerm.user_id == user_id)
     if active_only:
-        query = query.filter(MonitoredTerm.is_active == True)
-    return [t.term for t in query.all()]
+        query = query.where(MonitoredTerm.is_active == True)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        return list(result.scalars().all())
 
 
 def build_term_filter(terms: list):
@@ -35,14 +44,7 @@ def build_term_filter(terms: list):
     return or_(*term_filters) if term_filters else None
 
 
-@router.get("/stats", response_model=StatsResponse)
-async def get_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    terms = get_user_terms(db, current_user.id)
-    active_terms = len(terms)
-
+async def stats_section(terms: list) -> StatsResponse:
     if not terms:
         return StatsResponse(
             total_news=0,
@@ -53,120 +55,95 @@ async def get_stats(
             active_terms=0
         )
 
-    term_filter = build_term_filter(terms)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
-    # Total news matching user's terms
-    total_news = db.query(News).filter(term_filter).count()
+    def count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
 
-    # News today
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    news_today = db.query(News).filter(
-        term_filter,
-        News.published_at >= today
-    ).count()
-
-    # Sentiment counts
-    positive_mentions = db.query(News).filter(
-        term_filter,
-        News.sentiment == SentimentType.POSITIVE
-    ).count()
-
-    negative_mentions = db.query(News).filter(
-        term_filter,
-        News.sentiment == SentimentType.NEGATIVE
-    ).count()
-
-    neutral_mentions = db.query(News).filter(
-        term_filter,
-        News.sentiment == SentimentType.NEUTRAL
-    ).count()
+    # All counters in a single pass over the matching news
+    query = select(
+        func.count(News.id),
+        count_where(News.published_at >= today),
+        count_where(News.sentiment == SentimentType.POSITIVE),
+        count_where(News.sentiment == SentimentType.NEGATIVE),
+        count_where(News.sentiment == SentimentType.NEUTRAL),
+    ).where(build_term_filter(terms))
+
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(query)).one()
 
     return StatsResponse(
-        total_news=total_news,
-        news_today=news_today,
-        positive_mentions=positive_mentions,
-        negative_mentions=negative_mentions,
-        neutral_mentions=neutral_mentions,
-        active_terms=active_terms
+        total_news=int(row[0]),
+        news_today=int(row[1]),
+        positive_mentions=int(row[2]),
+        negative_mentions=int(row[3]),
+        neutral_mentions=int(row[4]),
+        active_terms=len(terms)
     )
 
 
-@router.get("/trends", response_model=list[TrendResponse])
-async def get_trends(
-    days: int = 7,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    terms = get_user_terms(db, current_user.id)
-
+async def trends_section(terms: list, days: int = 7) -> list:
     if not terms:
         return []
 
     start_date = datetime.now() - timedelta(days=days)
     trends = []
 
-    for term in terms[:5]:  # Limit to top 5 terms
-        # Get news for this term in the date range
-        term_filter = or_(
-            News.title.ilike(f"%{term}%"),
-            News.content.ilike(f"%{term}%")
-        )
-
-        news_list = db.query(News).filter(
-            term_filter,
-            News.published_at >= start_date
-        ).all()
-
-        # Group by date
-        daily_data = defaultdict(lambda: {"count": 0, "sentiment_sum": 0})
-
-        for news in news_list:
-            if news.published_at:
-                date_str = news.published_at.strftime("%Y-%m-%d")
-                daily_data[date_str]["count"] += 1
-                daily_data[date_str]["sentiment_sum"] += news.sentiment_score or 0
-
-        # Build trend points
-        data_points = []
-        for date_str, values in sorted(daily_data.items()):
-            avg_sentiment = values["sentiment_sum"] / values["count"] if values["count"] > 0 else 0
-            data_points.append(TrendPoint(
-                date=date_str,
-                count=values["count"],
-                sentiment_avg=round(avg_sentiment, 2)
-            ))
-
-        trends.append(TrendResponse(term=term, data=data_points))
+    async with AsyncSessionLocal() as session:
+        for term in terms[:5]:  # Limit to top 5 terms
+            # Get news for this term in the date range
+            term_filter = or_(
+                News.title.ilike(f"%{term}%"),
+                News.content.ilike(f"%{term}%")
+            )
+
+            result = await session.execute(
+                select(News.published_at, News.sentiment_score).where(
+                    term_filter,
+                    News.published_at >= start_date
+                )
+            )
+
+            # Group by date
+            daily_data = defaultdict(lambda: {"count": 0, "sentiment_sum": 0})
+
+            for published_at, sentiment_score in result:
+                if published_at:
+                    date_str = published_at.strftime("%Y-%m-%d")
+                    daily_data[date_str]["count"] += 1
+                    daily_data[date_str]["sentiment_sum"] += sentiment_score or 0
+
+            # Build trend points
+            data_points = []
+            for date_str, values in sorted(daily_data.items()):
+                avg_sentiment = values["sentiment_sum"] / values["count"] if values["count"] > 0 else 0
+                data_points.append(TrendPoint(
+                    date=date_str,
+                    count=values["count"],
+                    sentiment_avg=round(avg_sentiment, 2)
+                ))
+
+            trends.append(TrendResponse(term=term, data=data_points))
 
     return trends
 
 
-@router.get("/sources", response_model=list[SourceStats])
-async def get_source_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    terms = get_user_terms(db, current_user.id)
-
+async def sources_section(terms: list) -> list:
     if not terms:
         return []
 
-    term_filter = build_term_filter(terms)
-
-    # Get all news matching terms
-    news_list = db.query(News.source).filter(term_filter).all()
+    query = select(News.source, func.count(News.id)).where(
+        build_term_filter(terms)
+    ).group_by(News.source)
 
-    # Count by source
-    source_counts = defaultdict(int)
-    total = 0
+    async with AsyncSessionLocal() as session:
+        source_counts = (await session.execute(query)).all()
 
-    for (source,) in news_list:
-        source_counts[source] += 1
-        total += 1
+    total = sum(count for _, count in source_counts)
 
     # Calculate percentages
     stats = []
-    for source, count in source_counts.items():
+    for source, count in source_counts:
         stats.append(SourceStats(
             source=source,
             count=count,
@@ -176,42 +153,92 @@ async def get_source_stats(
     return sorted(stats, key=lambda x: x.count, reverse=True)
 
 
-@router.get("", response_model=DashboardResponse)
-async def get_dashboard(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def recent_news_section(terms: list) -> list:
+    if not terms:
+        return []
+
+    query = select(
+        News.id,
+        News.title,
+        News.source,
+        News.sentiment,
+        News.published_at,
+        News.image_url
+    ).where(build_term_filter(terms)).order_by(News.published_at.desc()).limit(5)
+
+    async with AsyncSessionLocal() as session:
+        recent_list = (await session.execute(query)).all()
+
+    return [
+        {
+            "id": n.id,
+            "title": n.title,
+            "source": n.source,
+            "sentiment": n.sentiment.value if n.sentiment else None,
+            "published_at": n.published_at.isoformat() if n.published_at else None,
+            "image_url": n.image_url
+        }
+        for n in recent_list
+    ]
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats(current_user: CurrentUser = Depends(get_current_user)):
+    return await stats_section(await get_user_terms(current_user.id))
+
+
+@router.get("/trends", response_model=list[TrendResponse])
+async def get_trends(
+    days: int = 7,
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    # Get all dashboard data
-    stats = await get_stats(current_user, db)
-    trends = await get_trends(7, current_user, db)
-    sources = await get_source_stats(current_user, db)
-
-    # Get recent news
-    terms = get_user_terms(db, current_user.id)
-    recent_news = []
-
-    if terms:
-        term_filter = build_term_filter(terms)
-
-        recent_list = db.query(News).filter(term_filter).order_by(
-            News.published_at.desc()
-        ).limit(5).all()
-
-        recent_news = [
-            {
-                "id": n.id,
-                "title": n.title,
-                "source": n.source,
-                "sentiment": n.sentiment.value if n.sentiment else None,
-                "published_at": n.published_at.isoformat() if n.published_at else None,
-                "image_url": n.image_url
-            }
-            for n in recent_list
-        ]
+    return await trends_section(await get_user_terms(current_user.id), days)
+
+
+@router.get("/sources", response_model=list[SourceStats])
+async def get_source_stats(current_user: CurrentUser = Depends(get_current_user)):
+    return await sources_section(await get_user_terms(current_user.id))
+
+
+async def build_dashboard(user_id: str) -> dict:
+    """Compute the full dashboard payload, running every section concurrently"""
+    # One term lookup shared by all sections
+    terms = await get_user_terms(user_id)
+
+    stats, trends, sources, recent_news = await asyncio.gather(
+        stats_section(terms),
+        trends_section(terms, 7),
+        sources_section(terms),
+        recent_news_section(terms)
+    )
 
     return DashboardResponse(
         stats=stats,
         trends=trends,
         sources=sources,
         recent_news=recent_news
+    ).model_dump(mode="json")
+
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    user_id = current_user.id
+
+    # "news_today" changes with the date, so the day is part of the validator
+    validator = await build_validator(request, user_id, "dashboard", date.today())
+    if validator and validator.matches(request):
+        return validator.not_modified()
+
+    data, watermark = await response_cache.get_or_compute_versioned(
+        "dashboard",
+        user_id,
+        lambda: build_dashboard(user_id)
     )
+    if validator and watermark is not None and watermark != validator.watermark:
+        # A stale entry (refreshing in background) gets the validator of
+        # its own version, so polling clients pick up the fresh one
+        validator = await build_validator(request, user_id, "dashboard", date.today(), watermark=watermark)
+    return FastJSONResponse(data, headers=validator.headers if validator else None)
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+import orjson
+
+from ..config import settings
+from ..services.auth import create_stream_token, get_current_user, get_stream_user
+from ..services.events import event_broker
+from ..schemas.user import CurrentUser, StreamTokenResponse
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+def format_sse(event: dict) -> bytes:
+    """Encode an event in the text/event-stream format"""
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+@router.post("/token", response_model=StreamTokenResponse)
+async def get_stream_token(current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Short-lived token for /stream?token=, which EventSource needs since it
+    cannot send headers. It only opens the stream (an open stream outlives
+    it); clients fetch a new one before each (re)connection.
+    """
+    return StreamTokenResponse(
+        token=create_stream_token(current_user.id),
+        expires_in=settings.STREAM_TOKEN_EXPIRE_SECONDS
+    )
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    current_user: CurrentUser = Depends(get_stream_user)
+):
+    """
+    Server-Sent Events with the user's newly matched articles ("news_match")
+    and the per-term counters of each ingestion batch ("counters").
+    """
+    subscription = await event_broker.subscribe(current_user.id)
+
+    async def event_stream():
+        try:
+            yield b"retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Keeps proxies from closing an idle connection
+                    yield b": ping\n\n"
+                else:
+                    yield format_sse(event)
+        finally:
+            await subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,20 +1,28 @@
+import logging
 from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, delete
 
-from ..database import get_db
+from ..database import get_async_db
+from ..responses import FastJSONResponse
 from ..config import settings
-from ..models import User, MonitoredTerm, NewsTermMatch
+from ..models import MonitoredTerm, NewsTermMatch, Alert
 from ..services.auth import get_current_user
+from ..services.cache import response_cache
+from ..services.scrape_scheduler import request_term_scrape
+from ..schemas.user import CurrentUser
 from ..schemas.filter import (
     FilterCreate,
     FilterUpdate,
     FilterResponse,
-    FilterListResponse
+    FilterListResponse,
+    BackfillStatusResponse
 )
 
 router = APIRouter(prefix="/filters", tags=["Filters"])
+logger = logging.getLogger(__name__)
 
 
 def get_user_plan_limit(plan_type: str) -> int:
@@ -23,58 +31,79 @@ def get_user_plan_limit(plan_type: str) -> int:
     return settings.FREE_PLAN_TERM_LIMIT
 
 
+async def enqueue_backfill(term_id: str) -> Optional[str]:
+    """Queue matching of the term against stored news. Returns the task id."""
+    from ..tasks.scraping import backfill_term_task
+
+    try:
+        # Publishing to the broker is blocking I/O, kept off the event loop
+        result = await run_in_threadpool(backfill_term_task.delay, term_id)
+        return result.id
+    except Exception as e:
+        # The term is saved either way; it just won't see older news
+        logger.error(f"Error queueing backfill for term {term_id}: {e}")
+        return None
+
+
 @router.get("", response_model=FilterListResponse)
 async def list_filters(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     plan_type = current_user.plan_type.value
     plan_limit = get_user_plan_limit(plan_type)
 
-    # Get filters with match counts
-    filters_query = db.query(
-        MonitoredTerm,
-        func.count(NewsTermMatch.id).label('match_count')
-    ).outerjoin(
-        NewsTermMatch, MonitoredTerm.id == NewsTermMatch.term_id
-    ).filter(
+    # Match counters are kept on the term row by ingestion, no join needed
+    filters_query = select(
+        MonitoredTerm.id,
+        MonitoredTerm.user_id,
+        MonitoredTerm.term,
+        MonitoredTerm.is_active,
+        MonitoredTerm.created_at,
+        MonitoredTerm.match_total,
+        MonitoredTerm.last_matched_at
+    ).where(
         MonitoredTerm.user_id == current_user.id
-    ).group_by(MonitoredTerm.id).order_by(MonitoredTerm.created_at.desc())
-
-    filters_result = filters_query.all()
-
-    filters = []
-    for term, match_count in filters_result:
-        filters.append(FilterResponse(
-            id=term.id,
-            user_id=term.user_id,
-            term=term.term,
-            is_active=term.is_active,
-            created_at=term.created_at,
-            match_count=match_count or 0
-        ))
-
-    return FilterListResponse(
-        items=filters,
-        total=len(filters),
-        limit_reached=len(filters) >= plan_limit,
-        plan_limit=plan_limit
-    )
+    ).order_by(MonitoredTerm.created_at.desc())
+
+    filters_result = (await db.execute(filters_query)).all()
+
+    filters = [
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "term": row.term,
+            "is_active": row.is_active,
+            "created_at": row.created_at,
+            "match_count": row.match_total,
+            "last_matched_at": row.last_matched_at
+        }
+        for row in filters_result
+    ]
+
+    return FastJSONResponse({
+        "items": filters,
+        "total": len(filters),
+        "limit_reached": len(filters) >= plan_limit,
+        "plan_limit": plan_limit
+    })
 
 
 @router.post("", response_model=FilterResponse)
 async def create_filter(
     filter_data: FilterCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     plan_type = current_user.plan_type.value
     plan_limit = get_user_plan_limit(plan_type)
 
     # Count existing filters
-    existing_count = db.query(MonitoredTerm).filter(
-        MonitoredTerm.user_id == current_user.id
-    ).count()
+    existing_count = await db.scalar(
+        select(func.count(MonitoredTerm.id)).where(
+            MonitoredTerm.user_id == current_user.id
+        )
+    )
 
     if existing_count >= plan_limit:
         raise HTTPException(
@@ -83,10 +112,13 @@ async def create_filter(
         )
 
     # Check if term already exists for this user
-    existing_term = db.query(MonitoredTerm).filter(
-        MonitoredTerm.user_id == current_user.id,
-        MonitoredTerm.term == filter_data.term.lower()
-    ).first()
+    result = await db.execute(
+        select(MonitoredTerm).where(
+            MonitoredTerm.user_id == current_user.id,
+            MonitoredTerm.term == filter_data.term.lower()
+        )
+    )
+    existing_term = result.scalar_one_or_none()
 
     if existing_term:
         raise HTTPException(status_code=400, detail="Termo já cadastrado")
@@ -98,9 +130,21 @@ async def create_filter(
         is_active=filter_data.is_active
     )
 
+    # Terms someone else already monitors are crawled by the regular job
+    already_crawled = await db.scalar(
+        select(MonitoredTerm.id).where(
+            MonitoredTerm.term == new_filter.term,
+            MonitoredTerm.is_active == True
+        ).limit(1)
+    )
+
     db.add(new_filter)
-    db.commit()
-    db.refresh(new_filter)
+    await db.commit()
+    await db.refresh(new_filter)
+    await response_cache.bump_terms_version(current_user.id)
+
+    if new_filter.is_active and not already_crawled:
+        await request_term_scrape(new_filter.term, current_user.plan_type)
 
     return FilterResponse(
         id=new_filter.id,
@@ -108,7 +152,49 @@ async def create_filter(
         term=new_filter.term,
         is_active=new_filter.is_active,
         created_at=new_filter.created_at,
-        match_count=0
+        match_count=0,
+        # Ingestion skips inactive terms; reactivating one queues its backfill
+        backfill_task_id=await enqueue_backfill(new_filter.id) if new_filter.is_active else None
+    )
+
+
+@router.get("/backfill/{task_id}", response_model=BackfillStatusResponse)
+async def get_backfill_status(
+    task_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    from celery.result import AsyncResult
+    from ..tasks.scraping import celery_app
+
+    def fetch():
+        result = AsyncResult(task_id, app=celery_app)
+        return result.state, result.info
+
+    # The result backend client is blocking
+    state, info = await run_in_threadpool(fetch)
+    status = info if isinstance(info, dict) else {}
+
+    # Queued tasks carry no metadata yet (Celery reports unknown ids as
+    # PENDING too); once running, only the term's owner may see them
+    term_id = status.get("term_id")
+    if term_id:
+        owned = await db.scalar(
+            select(MonitoredTerm.id).where(
+                MonitoredTerm.id == term_id,
+                MonitoredTerm.user_id == current_user.id
+            )
+        )
+        if not owned:
+            raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+
+    return BackfillStatusResponse(
+        task_id=task_id,
+        state=state,
+        term_id=term_id,
+        total=status.get("total"),
+        scanned=status.get("scanned"),
+        matched=status.get("matched")
     )
 
 
@@ -116,14 +202,17 @@ async def create_filter(
 async def update_filter(
     filter_id: str,
     filter_data: FilterUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Check ownership
-    existing = db.query(MonitoredTerm).filter(
-        MonitoredTerm.id == filter_id,
-        MonitoredTerm.user_id == current_user.id
-    ).first()
+    # Check ownership; the row lock orders the update with running backfills
+    result = await db.execute(
+        select(MonitoredTerm).where(
+            MonitoredTerm.id == filter_id,
+            MonitoredTerm.user_id == current_user.id
+        ).with_for_update()
+    )
+    existing = result.scalar_one_or_none()
 
     if not existing:
         raise HTTPException(status_code=404, detail="Filtro não encontrado")
@@ -133,11 +222,27 @@ async def update_filter(
     if "term" in update_data:
         update_data["term"] = update_data["term"].lower()
 
+    renamed = "term" in update_data and update_data["term"] != existing.term
+    # Inactive terms are skipped by ingestion, so reactivation catches up too
+    reactivated = update_data.get("is_active") and not existing.is_active
+
     for key, value in update_data.items():
         setattr(existing, key, value)
 
-    db.commit()
-    db.refresh(existing)
+    # The old text's matches go with the rename, whether or not the re-match
+    # below gets queued
+    if renamed:
+        await db.execute(delete(NewsTermMatch).where(NewsTermMatch.term_id == existing.id))
+        existing.match_total = 0
+        existing.last_matched_at = None
+
+    await db.commit()
+    await db.refresh(existing)
+    await response_cache.bump_terms_version(current_user.id)
+
+    backfill_task_id = None
+    if renamed or reactivated:
+        backfill_task_id = await enqueue_backfill(existing.id)
 
     return FilterResponse(
         id=existing.id,
@@ -145,27 +250,34 @@ async def update_filter(
         term=existing.term,
         is_active=existing.is_active,
         created_at=existing.created_at,
-        match_count=0
+        match_count=existing.match_total,
+        last_matched_at=existing.last_matched_at,
+        backfill_task_id=backfill_task_id
     )
 
 
 @router.delete("/{filter_id}")
 async def delete_filter(
     filter_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check ownership
-    existing = db.query(MonitoredTerm).filter(
-        MonitoredTerm.id == filter_id,
-        MonitoredTerm.user_id == current_user.id
-    ).first()
+    existing_id = await db.scalar(
+        select(MonitoredTerm.id).where(
+            MonitoredTerm.id == filter_id,
+            MonitoredTerm.user_id == current_user.id
+        )
+    )
 
-    if not existing:
+    if not existing_id:
         raise HTTPException(status_code=404, detail="Filtro não encontrado")
 
-    # Delete (cascade will handle related matches)
-    db.delete(existing)
-    db.commit()
+    # Core deletes, so nothing is loaded into the session: matches go through
+    # the FK's ON DELETE CASCADE; alerts would only be nulled, so drop them first
+    await db.execute(delete(Alert).where(Alert.term_id == existing_id))
+    await db.execute(delete(MonitoredTerm).where(MonitoredTerm.id == existing_id))
+    await db.commit()
+    await response_cache.bump_terms_version(current_user.id)
 
     return {"message": "Filtro removido com sucesso"}
@@ -1,155 +1,444 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional, List, Dict, Tuple, AsyncIterator
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+import base64
+import csv
+import io
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, select, func
 
-from ..database import get_db
-from ..models import User, News, MonitoredTerm
+from ..config import settings
+from ..database import get_async_db, AsyncSessionLocal
+from ..responses import FastJSONResponse
+from ..models import News, MonitoredTerm, NewsTermMatch
 from ..services.auth import get_current_user
+from ..services.conditional import build_validator
+from ..schemas.user import CurrentUser
 from ..schemas.news import (
     NewsResponse,
     NewsListResponse,
     NewsSource,
-    SentimentType
+    SentimentType,
+    ExportFormat,
+    NewsChangesResponse
 )
 
 router = APIRouter(prefix="/news", tags=["News"])
 
 
-@router.get("", response_model=NewsListResponse)
-async def list_news(
-    term: Optional[str] = Query(None, description="Filtrar por termo"),
-    source: Optional[NewsSource] = Query(None, description="Filtrar por fonte"),
-    sentiment: Optional[SentimentType] = Query(None, description="Filtrar por sentimento"),
-    start_date: Optional[datetime] = Query(None, description="Data inicial"),
-    end_date: Optional[datetime] = Query(None, description="Data final"),
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    # Get user's monitored terms
-    user_terms = db.query(MonitoredTerm).filter(
-        MonitoredTerm.user_id == current_user.id,
-        MonitoredTerm.is_active == True
-    ).all()
+# Columns only sent when asked for through ?fields=
+HEAVY_NEWS_FIELDS = {"content"}
+
+# Columns loaded for list items; heavy fields are appended on request
+NEWS_LIST_COLUMNS = (
+    News.id,
+    News.title,
+    News.summary,
+    News.url,
+    News.image_url,
+    News.author,
+    News.source,
+    News.published_at,
+    News.sentiment,
+    News.sentiment_score,
+    News.scraped_at,
+)
 
-    terms = [t.term for t in user_terms]
 
-    if not terms:
-        return NewsListResponse(
-            items=[],
-            total=0,
-            page=page,
-            per_page=per_page,
-            total_pages=0
+def parse_fields(fields: Optional[str]) -> set:
+    """Parse the comma-separated fields parameter"""
+    requested = {f.strip() for f in (fields or "").split(",") if f.strip()}
+    unknown = requested - HEAVY_NEWS_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos inválidos: {', '.join(sorted(unknown))}"
         )
+    return requested
 
-    # Build query
-    query = db.query(News)
+
+def term_match(term: str):
+    """SQL condition for a term appearing in the title or content"""
+    return or_(
+        News.title.ilike(f"%{term}%"),
+        News.content.ilike(f"%{term}%")
+    )
+
+
+def build_news_filters(
+    terms: list,
+    term: Optional[str] = None,
+    source: Optional[NewsSource] = None,
+    sentiment: Optional[SentimentType] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> list:
+    """Build the WHERE conditions shared by the news listing endpoints"""
+    conditions = []
 
     # Filter by source
     if source:
-        query = query.filter(News.source == source.value)
+        conditions.append(News.source == source.value)
 
     # Filter by sentiment
     if sentiment:
-        query = query.filter(News.sentiment == sentiment.value)
+        conditions.append(News.sentiment == sentiment.value)
 
     # Filter by date range
     if start_date:
-        query = query.filter(News.published_at >= start_date)
+        conditions.append(News.published_at >= start_date)
     if end_date:
-        query = query.filter(News.published_at <= end_date)
+        conditions.append(News.published_at <= end_date)
 
-    # Filter by term in title or content
+    # Filter by term in title or content, or by any of user's monitored terms
     if term:
-        query = query.filter(
-            or_(
-                News.title.ilike(f"%{term}%"),
-                News.content.ilike(f"%{term}%")
-            )
-        )
+        conditions.append(term_match(term))
     else:
-        # Filter by any of user's monitored terms
-        term_filters = []
-        for t in terms:
-            term_filters.append(News.title.ilike(f"%{t}%"))
-            term_filters.append(News.content.ilike(f"%{t}%"))
-        if term_filters:
-            query = query.filter(or_(*term_filters))
+        conditions.append(or_(*[term_match(t) for t in terms]))
+
+    return conditions
+
+
+async def load_term_matches(
+    db: AsyncSession,
+    user_id: str,
+    news_ids: list,
+    active_only: bool = True
+) -> Dict[str, Tuple[List[str], int]]:
+    """
+    Resolve the user's matched terms for a batch of news in one query,
+    using the matches written at ingestion time.
+    Returns {news_id: (matched_terms, total match_count)}.
+    """
+    if not news_ids:
+        return {}
+
+    query = select(
+        NewsTermMatch.news_id,
+        MonitoredTerm.term,
+        NewsTermMatch.match_count
+    ).join(
+        MonitoredTerm, MonitoredTerm.id == NewsTermMatch.term_id
+    ).where(
+        NewsTermMatch.news_id.in_(news_ids),
+        MonitoredTerm.user_id == user_id
+    ).order_by(NewsTermMatch.match_count.desc())
+    if active_only:
+        query = query.where(MonitoredTerm.is_active == True)
+
+    matches: Dict[str, Tuple[List[str], int]] = {}
+    for news_id, term, match_count in await db.execute(query):
+        terms, count = matches.get(news_id, ([], 0))
+        terms.append(term)
+        matches[news_id] = (terms, count + (match_count or 0))
+
+    return matches
+
+
+def news_to_dict(news, matched_terms: List[str], match_count: int) -> dict:
+    """Map a News row (or ORM object) straight to the NewsResponse shape"""
+    return {
+        "id": news.id,
+        "title": news.title,
+        "summary": news.summary,
+        "content": getattr(news, "content", None),
+        "url": news.url,
+        "image_url": news.image_url,
+        "author": news.author,
+        "source": news.source,
+        "published_at": news.published_at,
+        "sentiment": news.sentiment.value if news.sentiment else None,
+        "sentiment_score": news.sentiment_score,
+        "scraped_at": news.scraped_at,
+        "matched_terms": matched_terms,
+        "match_count": match_count,
+    }
+
+
+@router.get("", response_model=NewsListResponse)
+async def list_news(
+    request: Request,
+    term: Optional[str] = Query(None, description="Filtrar por termo"),
+    source: Optional[NewsSource] = Query(None, description="Filtrar por fonte"),
+    sentiment: Optional[SentimentType] = Query(None, description="Filtrar por sentimento"),
+    start_date: Optional[datetime] = Query(None, description="Data inicial"),
+    end_date: Optional[datetime] = Query(None, description="Data final"),
+    fields: Optional[str] = Query(None, description="Campos extras, separados por vírgula (ex.: content)"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    extra_fields = parse_fields(fields)
+
+    # Answer polling clients before running any query
+    validator = await build_validator(request, current_user.id, "news")
+    if validator and validator.matches(request):
+        return validator.not_modified()
+
+    # Get user's monitored terms
+    result = await db.execute(
+        select(MonitoredTerm.term).where(
+            MonitoredTerm.user_id == current_user.id,
+            MonitoredTerm.is_active == True
+        )
+    )
+    terms = list(result.scalars().all())
+
+    if not terms:
+        return FastJSONResponse({
+            "items": [],
+            "total": 0,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": 0
+        }, headers=validator.headers if validator else None)
+
+    conditions = build_news_filters(terms, term, source, sentiment, start_date, end_date)
 
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count(News.id)).where(*conditions))
+
+    # Build query. The content TEXT column stays unloaded unless requested.
+    columns = NEWS_LIST_COLUMNS
+    if "content" in extra_fields:
+        columns += (News.content,)
+    query = select(*columns).where(*conditions)
 
     # Pagination
     offset = (page - 1) * per_page
-    news_list = query.order_by(News.published_at.desc()).offset(offset).limit(per_page).all()
+    result = await db.execute(
+        query.order_by(News.published_at.desc()).offset(offset).limit(per_page)
+    )
+    news_list = result.all()
 
     total_pages = (total + per_page - 1) // per_page
 
+    # Find which terms match each news on the page
+    matches = await load_term_matches(db, current_user.id, [n.id for n in news_list])
+
     items = []
     for news in news_list:
-        # Find which terms match this news
-        matched_terms = []
-        title_lower = (news.title or "").lower()
-        content_lower = (news.content or "").lower()
-
-        for t in terms:
-            if t.lower() in title_lower or t.lower() in content_lower:
-                matched_terms.append(t)
-
-        items.append(NewsResponse(
-            id=news.id,
-            title=news.title,
-            summary=news.summary,
-            content=news.content,
-            url=news.url,
-            image_url=news.image_url,
-            author=news.author,
-            source=news.source,
-            published_at=news.published_at,
-            sentiment=news.sentiment.value if news.sentiment else None,
-            sentiment_score=news.sentiment_score,
-            scraped_at=news.scraped_at,
-            matched_terms=matched_terms
-        ))
-
-    return NewsListResponse(
-        items=items,
-        total=total,
-        page=page,
-        per_page=per_page,
-        total_pages=total_pages
+        matched_terms, match_count = matches.get(news.id, ([], 0))
+        items.append(news_to_dict(news, matched_terms, match_count))
+
+    return FastJSONResponse({
+        "items": items,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages
+    }, headers=validator.headers if validator else None)
+
+
+# Rows fetched per round trip from the server-side cursor during exports
+EXPORT_BATCH_SIZE = 500
+
+
+async def stream_news_export(
+    user_id: str,
+    conditions: list,
+    columns: tuple,
+    export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """
+    Stream every matching news through a server-side cursor, one batch at a
+    time, so memory stays flat regardless of the result size.
+    Uses its own sessions: the request session is gone while the body streams.
+    """
+    query = select(*columns).where(*conditions).order_by(News.published_at.desc())
+    field_names = [c.key for c in columns] + ["matched_terms", "match_count"]
+
+    if export_format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(field_names)
+        yield buffer.getvalue().encode("utf-8")
+
+    # The streaming connection stays busy with the cursor, so term matches
+    # for each batch are looked up through a second session
+    async with AsyncSessionLocal() as session, AsyncSessionLocal() as lookup:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        async for batch in result.partitions():
+            matches = await load_term_matches(lookup, user_id, [n.id for n in batch])
+            items = [
+                news_to_dict(news, *matches.get(news.id, ([], 0)))
+                for news in batch
+            ]
+
+            if export_format == ExportFormat.NDJSON:
+                yield b"".join(
+                    orjson.dumps({k: item[k] for k in field_names}) + b"\n"
+                    for item in items
+                )
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for item in items:
+                    item["matched_terms"] = "|".join(item["matched_terms"])
+                    item["published_at"] = item["published_at"].isoformat() if item["published_at"] else None
+                    item["scraped_at"] = item["scraped_at"].isoformat() if item["scraped_at"] else None
+                    writer.writerow([item[k] for k in field_names])
+                yield buffer.getvalue().encode("utf-8")
+
+
+@router.get("/export")
+async def export_news(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format", description="csv ou ndjson"),
+    term: Optional[str] = Query(None, description="Filtrar por termo"),
+    source: Optional[NewsSource] = Query(None, description="Filtrar por fonte"),
+    sentiment: Optional[SentimentType] = Query(None, description="Filtrar por sentimento"),
+    start_date: Optional[datetime] = Query(None, description="Data inicial"),
+    end_date: Optional[datetime] = Query(None, description="Data final"),
+    fields: Optional[str] = Query(None, description="Campos extras, separados por vírgula (ex.: content)"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    extra_fields = parse_fields(fields)
+
+    # Get user's monitored terms
+    result = await db.execute(
+        select(MonitoredTerm.term).where(
+            MonitoredTerm.user_id == current_user.id,
+            MonitoredTerm.is_active == True
+        )
+    )
+    terms = list(result.scalars().all())
+
+    if not terms:
+        raise HTTPException(status_code=400, detail="Nenhum termo monitorado para exportar")
+
+    conditions = build_news_filters(terms, term, source, sentiment, start_date, end_date)
+
+    columns = NEWS_LIST_COLUMNS
+    if "content" in extra_fields:
+        columns += (News.content,)
+
+    media_type = "text/csv" if export_format == ExportFormat.CSV else "application/x-ndjson"
+    filename = f"ecoa-noticias-{datetime.now():%Y%m%d-%H%M}.{export_format.value}"
+
+    return StreamingResponse(
+        stream_news_export(current_user.id, conditions, columns, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 
+def encode_cursor(created_at: datetime, match_id: str) -> str:
+    """Opaque sync cursor: position of the last match row returned"""
+    raw = f"{created_at.isoformat()}|{match_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, match_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), match_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+@router.get("/changes", response_model=NewsChangesResponse)
+async def list_news_changes(
+    since: Optional[str] = Query(None, description="Cursor retornado pela chamada anterior"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    News matched for the user after the given cursor, oldest first.
+    Without a cursor, returns no items and the current position, so clients
+    can start syncing after loading the first page of /news.
+
+    The cursor is (created_at, match id), and created_at is set before the
+    match's transaction commits, so two ingests can commit out of order.
+    Only matches older than CHANGES_SETTLE_SECONDS are returned, which keeps
+    every cursor behind rows that may still be committing. Clients can get
+    a news item twice, both from /news and from here, but never miss one.
+    """
+    settled_at = datetime.utcnow() - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+
+    user_matches = select(
+        NewsTermMatch.id,
+        NewsTermMatch.news_id,
+        NewsTermMatch.created_at,
+        NewsTermMatch.match_count,
+        MonitoredTerm.term
+    ).join(
+        MonitoredTerm, MonitoredTerm.id == NewsTermMatch.term_id
+    ).where(
+        MonitoredTerm.user_id == current_user.id,
+        MonitoredTerm.is_active == True
+    )
+
+    if since is None:
+        return FastJSONResponse({"items": [], "next_cursor": encode_cursor(settled_at, ""), "has_more": False})
+
+    since_at, since_id = decode_cursor(since)
+
+    # Served by idx_match_term_created: cost grows with new matches only
+    result = await db.execute(
+        user_matches.where(
+            or_(
+                NewsTermMatch.created_at > since_at,
+                and_(NewsTermMatch.created_at == since_at, NewsTermMatch.id > since_id)
+            ),
+            NewsTermMatch.created_at <= settled_at
+        ).order_by(NewsTermMatch.created_at, NewsTermMatch.id).limit(limit + 1)
+    )
+    match_rows = result.all()
+
+    has_more = len(match_rows) > limit
+    match_rows = match_rows[:limit]
+
+    if not match_rows:
+        return FastJSONResponse({"items": [], "next_cursor": since, "has_more": False})
+
+    # Group match rows by news, keeping the order they were matched in
+    matches: Dict[str, Tuple[List[str], int]] = {}
+    for row in match_rows:
+        terms, count = matches.get(row.news_id, ([], 0))
+        terms.append(row.term)
+        matches[row.news_id] = (terms, count + (row.match_count or 0))
+
+    result = await db.execute(
+        select(*NEWS_LIST_COLUMNS).where(News.id.in_(list(matches)))
+    )
+    news_by_id = {news.id: news for news in result.all()}
+
+    items = [
+        news_to_dict(news_by_id[news_id], *matches[news_id])
+        for news_id in matches
+        if news_id in news_by_id
+    ]
+
+    last = match_rows[-1]
+    return FastJSONResponse({
+        "items": items,
+        "next_cursor": encode_cursor(last.created_at, last.id),
+        "has_more": has_more
+    })
+
+
 @router.get("/{news_id}", response_model=NewsResponse)
 async def get_news(
     news_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    news = db.query(News).filter(News.id == news_id).first()
+    result = await db.execute(select(News).where(News.id == news_id))
+    news = result.scalar_one_or_none()
 
     if not news:
         raise HTTPException(status_code=404, detail="Notícia não encontrada")
 
-    # Get user's terms to show matches
-    user_terms = db.query(MonitoredTerm).filter(
-        MonitoredTerm.user_id == current_user.id
-    ).all()
-
-    terms = [t.term for t in user_terms]
-    matched_terms = []
-
-    title_lower = (news.title or "").lower()
-    content_lower = (news.content or "").lower()
-
-    for t in terms:
-        if t.lower() in title_lower or t.lower() in content_lower:
-            matched_terms.append(t)
+    # Get user's term matches
+    matches = await load_term_matches(db, current_user.id, [news.id], active_only=False)
+    matched_terms, match_count = matches.get(news.id, ([], 0))
 
     return NewsResponse(
         id=news.id,
@@ -164,12 +453,13 @@ async def get_news(
         sentiment=news.sentiment.value if news.sentiment else None,
         sentiment_score=news.sentiment_score,
         scraped_at=news.scraped_at,
-        matched_terms=matched_terms
+        matched_terms=matched_terms,
+        match_count=match_count
     )
 
 
 @router.get("/sources/list")
-async def list_sources(current_user: User = Depends(get_current_user)):
+async def list_sources(current_user: CurrentUser = Depends(get_current_user)):
     return {
         "sources": [
             {"id": "g1", "name": "G1", "url": "https://g1.globo.com"},
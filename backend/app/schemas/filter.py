@@ -22,6 +22,9 @@ class FilterResponse(FilterBase):
     user_id: str
     created_at: datetime
     match_count: int = 0
+    last_matched_at: Optional[datetime] = None
+    # Set when a background job is matching the term against stored news
+    backfill_task_id: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -34,6 +37,15 @@ class FilterListResponse(BaseModel):
     plan_limit: int
 
 
+class BackfillStatusResponse(BaseModel):
+    task_id: str
+    state: str
+    term_id: Optional[str] = None
+    total: Optional[int] = None
+    scanned: Optional[int] = None
+    matched: Optional[int] = None
+
+
 class AlertBase(BaseModel):
     term_id: str
     alert_type: str = "email"
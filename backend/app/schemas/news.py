@@ -17,6 +17,11 @@ class NewsSource(str, Enum):
     THREADS = "threads"
 
 
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 class NewsBase(BaseModel):
     title: str
     summary: Optional[str] = None
@@ -38,6 +43,7 @@ class NewsResponse(NewsBase):
     sentiment_score: Optional[float] = None
     scraped_at: datetime
     matched_terms: List[str] = []
+    match_count: int = 0  # Total mentions of the matched terms
 
     class Config:
         from_attributes = True
@@ -51,6 +57,12 @@ class NewsListResponse(BaseModel):
     total_pages: int
 
 
+class NewsChangesResponse(BaseModel):
+    items: List[NewsResponse]
+    next_cursor: str
+    has_more: bool = False
+
+
 class NewsFilters(BaseModel):
     term: Optional[str] = None
     source: Optional[NewsSource] = None
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 from datetime import datetime
 
+from ..models.user import PlanType
+
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -47,3 +49,24 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserResponse
+
+
+class StreamTokenResponse(BaseModel):
+    token: str
+    expires_in: int
+
+
+class CurrentUser(BaseModel):
+    """Projection of the authenticated user kept in the auth cache"""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: str
+    email: str
+    full_name: Optional[str] = None
+    political_name: Optional[str] = None
+    party: Optional[str] = None
+    state: Optional[str] = None
+    avatar_url: Optional[str] = None
+    plan_type: PlanType = PlanType.FREE
+    is_active: bool = True
+    created_at: Optional[datetime] = None
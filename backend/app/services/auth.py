@@ -1,14 +1,36 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import HTTPException, status, Depends, Header
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from fastapi import HTTPException, status, Depends, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, event
 
 from ..config import settings
-from ..database import get_db
+from ..database import get_async_db, AsyncSessionLocal
 from ..models import User
+from ..schemas.user import CurrentUser
+from .cache import TTLCache
+
+# Scope of the short-lived tokens accepted in /events/stream?token=, where
+# they may end up in access logs; they are refused everywhere else
+STREAM_SCOPE = "stream"
+
+# Token -> (user id, scope) of decoded JWTs and user id -> active user projection.
+# Both are per process; AUTH_CACHE_TTL_SECONDS bounds how long another
+# worker may keep serving a user changed elsewhere.
+_token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+_user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+# bcrypt runs here instead of on the event loop; the pool size caps how many
+# hashes run at once, so a burst of logins queues instead of starving the API
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,10 +45,34 @@ def get_password_hash(password: str) -> str:
     """Gera hash da senha"""
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     ).decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Verifica se o hash foi gerado com um custo diferente do configurado"""
+    # Format: $2b$<rounds>$<salt+hash>
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.BCRYPT_ROUNDS
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifica a senha no pool de hashing, sem bloquear o event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Gera o hash da senha no pool de hashing, sem bloquear o event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Cria um token JWT"""
     to_encode = data.copy()
@@ -39,6 +85,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def create_stream_token(user_id: str) -> str:
+    """Cria um token de curta duração, válido apenas para abrir o stream de eventos"""
+    return create_access_token(
+        data={"sub": user_id, "scope": STREAM_SCOPE},
+        expires_delta=timedelta(seconds=settings.STREAM_TOKEN_EXPIRE_SECONDS)
+    )
+
+
 def decode_token(token: str) -> dict:
     """Decodifica e valida um token JWT"""
     try:
@@ -52,30 +106,61 @@ def decode_token(token: str) -> dict:
         )
 
 
-def get_current_user(
-    authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
-) -> User:
-    """Obtém o usuário atual a partir do token JWT"""
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token não fornecido",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+def invalidate_user_cache(user_id: str) -> None:
+    """Remove o usuário do cache de autenticação"""
+    _user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # Covers profile edits, plan changes and deactivation from any code path
+    invalidate_user_cache(target.id)
 
-    token = authorization.replace("Bearer ", "")
-    payload = decode_token(token)
 
-    user_id: str = payload.get("sub")
-    if user_id is None:
+def _resolve_token(token: str, scope: Optional[str] = None) -> str:
+    """Decodifica o token (com cache) e retorna o id do usuário, exigindo o escopo dado"""
+    cached = _token_cache.get(token)
+    if cached is not None:
+        user_id, token_scope = cached
+    else:
+        payload = decode_token(token)
+
+        user_id = payload.get("sub")
+        token_scope = payload.get("scope")
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token inválido",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        # Never keep a token cached beyond its own expiration
+        ttl = settings.AUTH_CACHE_TTL_SECONDS
+        if payload.get("exp"):
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            _token_cache.set(token, (user_id, token_scope), ttl)
+
+    if token_scope != scope:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido",
+            detail="Token inválido para este recurso",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return user_id
+
+
+async def resolve_user(token: str, db: AsyncSession, scope: Optional[str] = None) -> CurrentUser:
+    """Resolve um token JWT para o usuário ativo correspondente"""
+    user_id = _resolve_token(token, scope)
 
-    user = db.query(User).filter(User.id == user_id).first()
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,14 +175,68 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
+    current_user = CurrentUser.model_validate(user)
+    _user_cache.set(user_id, current_user)
+    return current_user
+
+
+async def get_current_user(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """Obtém o usuário atual a partir do token JWT"""
+    if not authorization:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token não fornecido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    token = authorization.replace("Bearer ", "")
+    return await resolve_user(token, db)
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def get_stream_user(
+    authorization: Optional[str] = Header(None),
+    token: Optional[str] = Query(
+        None,
+        description="Token de stream de POST /events/token (EventSource não envia headers)"
+    )
+) -> CurrentUser:
+    """
+    Obtém o usuário de conexões longas (SSE) e usa uma sessão própria,
+    liberada antes do stream começar. Na query string só é aceito o token de
+    stream, de curta duração: URLs acabam nos logs de acesso, e o token de
+    login vale por dias. O header Authorization aceita o token de login.
+    """
+    if token:
+        raw_token, scope = token, STREAM_SCOPE
+    else:
+        raw_token, scope = (authorization or "").replace("Bearer ", ""), None
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token não fornecido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    async with AsyncSessionLocal() as db:
+        return await resolve_user(raw_token, db, scope)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Autentica um usuário pelo email e senha"""
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
+
+    # Upgrade hashes created with an outdated cost factor
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(password)
+        await db.commit()
+        await db.refresh(user)
+
     return user
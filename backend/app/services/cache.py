@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class CacheBackend(ABC):
+    """Storage interface shared by the in-process and Redis caches"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        pass
+
+    @abstractmethod
+    async def set_if_absent(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        """Store the value only if the key does not exist. Returns True if stored."""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class TTLCache:
+    """Bounded LRU mapping with per-entry expiry, for in-process lookups"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[Any, Optional[float]]]" = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Bounded LRU cache living in the API process"""
+
+    def __init__(self, max_entries: int = 1024):
+        self._cache = TTLCache(max_entries)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def set_if_absent(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        if self._cache.get(key) is not None:
+            return False
+        self._cache.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every API worker and the Celery processes"""
+
+    def __init__(self, url: str, prefix: str = "ecoa:"):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(self.url, decode_responses=True)
+        return self._client
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def set_if_absent(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        return bool(await self.client.set(self.prefix + key, value, ex=ttl, nx=True))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+
+def get_cache_backend() -> CacheBackend:
+    """Build the backend configured in CACHE_BACKEND"""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.REDIS_URL)
+    return MemoryCacheBackend(settings.CACHE_MEMORY_MAX_ENTRIES)
+
+
+class ResponseCache:
+    """
+    Per-user response cache with stale-while-revalidate.
+
+    Entries are keyed by user and terms version, so editing filters makes the
+    old entries unreachable. New articles move the ingest watermark instead:
+    entries computed before it are still served, but refreshed in background.
+    """
+
+    INGEST_KEY = "ingest:watermark"
+
+    def __init__(self, backend: CacheBackend, ttl: int, stale_ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _version(self, key: str) -> int:
+        # Seed missing versions with the current time so a restarted
+        # process never reuses a version number from a previous run
+        await self.backend.set_if_absent(key, str(_now_ms()))
+        value = await self.backend.get(key)
+        return int(value) if value else 0
+
+    async def ingest_watermark(self) -> int:
+        """Timestamp (ms) of the last scraping job that stored articles"""
+        return await self._version(self.INGEST_KEY)
+
+    async def terms_version(self, user_id: str) -> int:
+        """Version (ms timestamp of the last change) of the user's monitored terms"""
+        return await self._version(f"terms:{user_id}")
+
+    async def mark_ingest(self) -> None:
+        """Called after new articles are stored"""
+        try:
+            await self.backend.set(self.INGEST_KEY, str(_now_ms()))
+        except Exception as e:
+            logger.error(f"Error updating ingest watermark: {e}")
+
+    async def bump_terms_version(self, user_id: str) -> None:
+        """Called after the user's monitored terms change"""
+        key = f"terms:{user_id}"
+        try:
+            # Versions are ms timestamps, kept strictly increasing
+            previous = await self.backend.get(key)
+            version = max(_now_ms(), int(previous) + 1 if previous else 0)
+            await self.backend.set(key, str(version))
+        except Exception as e:
+            logger.error(f"Error updating terms version for {user_id}: {e}")
+
+    async def _store(self, key: str, data: Any, watermark: int) -> None:
+        entry = {"data": data, "computed_at": time.time(), "watermark": watermark}
+        await self.backend.set(key, json.dumps(entry), ttl=self.ttl + self.stale_ttl)
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            watermark = await self.ingest_watermark()
+            await self._store(key, await compute(), watermark)
+        except Exception as e:
+            logger.error(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, compute))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        user_id: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached response, computing it on a miss.
+        compute() must return JSON-serializable data and must not depend on
+        request-scoped resources, since it may run after the request ends.
+        """
+        data, _ = await self.get_or_compute_versioned(namespace, user_id, compute)
+        return data
+
+    async def get_or_compute_versioned(
+        self,
+        namespace: str,
+        user_id: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, Optional[int]]:
+        """
+        Like get_or_compute, also returning the ingest watermark the data was
+        computed at: older than the current one when a stale entry is served.
+        None if the cache is unavailable (the data was computed just now).
+        """
+        try:
+            watermark = await self.ingest_watermark()
+            key = f"resp:{namespace}:{user_id}:{await self.terms_version(user_id)}"
+            raw = await self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Cache unavailable, computing {namespace} directly: {e}")
+            return await compute(), None
+
+        if raw:
+            entry: Dict = json.loads(raw)
+            fresh = (
+                entry["watermark"] >= watermark
+                and time.time() - entry["computed_at"] < self.ttl
+            )
+            if not fresh:
+                self._schedule_refresh(key, compute)
+            return entry["data"], entry["watermark"]
+
+        data = await compute()
+        try:
+            await self._store(key, data, watermark)
+        except Exception as e:
+            logger.error(f"Error storing cache entry {key}: {e}")
+        return data, watermark
+
+
+# Global cache instance
+response_cache = ResponseCache(
+    get_cache_backend(),
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    stale_ttl=settings.DASHBOARD_CACHE_STALE_SECONDS
+)
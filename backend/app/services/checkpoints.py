@@ -0,0 +1,153 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import ScrapeJob, ScrapeJobStatus
+from .scraper import ScrapedArticle
+
+logger = logging.getLogger(__name__)
+
+
+class JobLeaseLost(RuntimeError):
+    """The job was taken over by another run after this one's lease expired"""
+
+
+class JobCheckpoint:
+    """
+    Progress of one scraping job, saved as its (source, term) units finish.
+
+    A job that finds an unfinished checkpoint for its key resumes it: units
+    already done are skipped and articles fetched but not stored are stored
+    first. The running job holds a lease (its owner id and a heartbeat): a
+    new delivery of the same task resumes at once, as does any run once the
+    owner stopped heartbeating for SCRAPE_JOB_LEASE_SECONDS; other runs with
+    the same key stand down.
+    """
+
+    def __init__(self, db: Session, job: ScrapeJob, owner: str, resumed: bool):
+        self.db = db
+        self.job = job
+        self.owner = owner
+        self.resumed = resumed
+
+    @classmethod
+    def acquire(cls, db: Session, job_key: str, owner: Optional[str] = None) -> Optional["JobCheckpoint"]:
+        """
+        Resume or start the job for job_key on behalf of owner (the Celery
+        task id, so redeliveries match). None if another run holds it.
+        """
+        owner = owner or str(uuid.uuid4())
+        now = datetime.utcnow()
+
+        # Finished checkpoints are only kept for a while, as job history
+        db.query(ScrapeJob).filter(
+            ScrapeJob.status == ScrapeJobStatus.COMPLETED,
+            ScrapeJob.finished_at < now - timedelta(days=settings.SCRAPE_JOB_HISTORY_DAYS)
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        # The row lock serializes runs deciding whether to take the job over
+        job = db.query(ScrapeJob).filter(
+            ScrapeJob.running_key == job_key
+        ).with_for_update().first()
+
+        if job:
+            lease_expired = (
+                job.heartbeat_at is None
+                or job.heartbeat_at < now - timedelta(seconds=settings.SCRAPE_JOB_LEASE_SECONDS)
+            )
+            if job.owner != owner and not lease_expired:
+                db.commit()
+                return None
+
+            job.attempts += 1
+            job.owner = owner
+            job.heartbeat_at = now
+            db.commit()
+            logger.info(
+                f"Resuming scrape job {job_key}: {len(job.done_units)} units done, "
+                f"{len(job.pending_articles)} articles pending"
+            )
+            return cls(db, job, owner, resumed=True)
+
+        job = ScrapeJob(
+            job_key=job_key,
+            running_key=job_key,
+            owner=owner,
+            heartbeat_at=now,
+            done_units=[],
+            pending_articles=[]
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another run started the job between our read and insert
+            db.rollback()
+            return None
+        return cls(db, job, owner, resumed=False)
+
+    def heartbeat(self) -> bool:
+        """
+        Extend the lease, in its own session so it can run in a thread while
+        the job works. False if another run took the job over.
+        """
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(ScrapeJob).where(
+                    ScrapeJob.id == self.job.id,
+                    ScrapeJob.owner == self.owner
+                ).values(heartbeat_at=datetime.utcnow())
+            )
+            db.commit()
+            return result.rowcount > 0
+        finally:
+            db.close()
+
+    def _lock(self) -> None:
+        """Reload the job under a row lock, checking this run still holds it"""
+        self.db.refresh(self.job, with_for_update=True)
+        if self.job.owner != self.owner:
+            self.db.rollback()
+            raise JobLeaseLost(f"Scrape job {self.job.job_key} was taken over by {self.job.owner}")
+
+    @property
+    def done_units(self) -> Set[Tuple[str, str]]:
+        """(source, term) pairs already crawled"""
+        return {(source, term) for source, term in self.job.done_units}
+
+    @property
+    def pending_articles(self) -> List[ScrapedArticle]:
+        return [ScrapedArticle.from_json(article) for article in self.job.pending_articles]
+
+    def units_fetched(self, units: List[Tuple[str, str]], articles: List[ScrapedArticle]) -> None:
+        """Record crawled (source, term) units and the articles they fetched, before storing them"""
+        self._lock()
+        # JSON columns only detect reassignment, never in-place mutation
+        self.job.done_units = self.job.done_units + [list(unit) for unit in units]
+        self.job.pending_articles = self.job.pending_articles + [article.to_json() for article in articles]
+        self.job.articles_found += len(articles)
+        self.job.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+
+    def articles_stored(self, stored_count: int) -> None:
+        self._lock()
+        self.job.pending_articles = []
+        self.job.articles_stored += stored_count
+        self.job.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+
+    def complete(self) -> None:
+        self._lock()
+        self.job.status = ScrapeJobStatus.COMPLETED
+        self.job.running_key = None
+        self.job.finished_at = datetime.utcnow()
+        self.db.commit()
@@ -0,0 +1,74 @@
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from .cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+
+class Validator:
+    """ETag/Last-Modified pair for a user's view of the data"""
+
+    def __init__(self, etag: str, last_modified_ms: int, watermark: int):
+        self.etag = etag
+        self.watermark = watermark
+        self.last_modified = datetime.fromtimestamp(last_modified_ms / 1000, tz=timezone.utc)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Browsers keep the body but revalidate on every poll
+            "Cache-Control": "private, no-cache",
+            "Vary": "Authorization",
+        }
+
+    def matches(self, request: Request) -> bool:
+        """True if the client's If-None-Match already has this version"""
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return "*" in candidates or self.etag.removeprefix("W/") in candidates
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+
+async def build_validator(
+    request: Request,
+    user_id: str,
+    namespace: str,
+    *extra,
+    watermark: Optional[int] = None
+) -> Optional[Validator]:
+    """
+    Cheap validator for a per-user response: the data only changes when a
+    scraping job stores articles (ingest watermark) or when the user edits
+    filters (terms version). Costs two cache lookups and no SQL.
+
+    Pass the watermark of the data actually served when it may be older
+    than the current one (a stale cache entry), so its ETag never matches
+    the fresh version. None when the cache is unavailable: the response is
+    then served in full, without validators.
+    """
+    try:
+        if watermark is None:
+            watermark = await response_cache.ingest_watermark()
+        terms_version = await response_cache.terms_version(user_id)
+    except Exception as e:
+        logger.error(f"Error reading cache versions, serving without validators: {e}")
+        return None
+
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    raw = ":".join(str(part) for part in (namespace, user_id, watermark, terms_version, query, *extra))
+    etag = 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+    return Validator(etag, max(watermark, terms_version), watermark)
+
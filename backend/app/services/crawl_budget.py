@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import CrawlStat
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]  # (source, term)
+
+
+class CrawlPlanner:
+    """
+    Spreads a fixed per-job fetch budget over (source, term) pairs.
+
+    Each run lists the first search page of every eligible pair, then hands
+    out article fetches in proportion to the pair's recent yield (a moving
+    average of new URLs per run), never beyond the new URLs it actually has.
+    Pairs that keep listing nothing new are backed off exponentially.
+    """
+
+    # Weight of the latest run in the moving average
+    ALPHA = 0.3
+    # Added to every weight so new and quiet pairs still get a share
+    PRIOR = 1.0
+
+    def load_stats(self, db: Session, pairs: Iterable[Pair]) -> Dict[Pair, CrawlStat]:
+        pairs = set(pairs)
+        terms = {term for _, term in pairs}
+        if not terms:
+            return {}
+        rows = db.query(CrawlStat).filter(CrawlStat.term.in_(terms)).all()
+        return {(row.source, row.term): row for row in rows if (row.source, row.term) in pairs}
+
+    def is_due(self, stat: CrawlStat, now: datetime) -> bool:
+        return stat is None or stat.next_crawl_at is None or stat.next_crawl_at <= now
+
+    def allocate(
+        self,
+        available: Dict[Pair, int],
+        stats: Dict[Pair, CrawlStat],
+        budget: int
+    ) -> Dict[Pair, int]:
+        """Split the budget by weight, capping each pair at its available URLs"""
+        caps = {
+            pair: min(count, settings.SCRAPE_MAX_FETCHES_PER_PAIR)
+            for pair, count in available.items()
+            if count > 0
+        }
+        allocation = {pair: 0 for pair in available}
+
+        # Water-filling: whatever a capped pair can't use goes back to the others
+        remaining = budget
+        open_pairs = set(caps)
+        while remaining > 0 and open_pairs:
+            weights = {
+                pair: (stats[pair].yield_avg if pair in stats else 0.0) + self.PRIOR
+                for pair in open_pairs
+            }
+            total_weight = sum(weights.values())
+            granted = 0
+            for pair in sorted(open_pairs, key=lambda p: weights[p], reverse=True):
+                share = max(1, int(remaining * weights[pair] / total_weight))
+                share = min(share, caps[pair] - allocation[pair], remaining - granted)
+                allocation[pair] += share
+                granted += share
+                if allocation[pair] >= caps[pair]:
+                    open_pairs.discard(pair)
+                if granted >= remaining:
+                    break
+            remaining -= granted
+            if granted == 0:
+                break
+
+        return allocation
+
+    def record(
+        self,
+        db: Session,
+        stats: Dict[Pair, CrawlStat],
+        new_counts: Dict[Pair, int],
+        now: datetime
+    ) -> None:
+        """Update yields and backoff after a run"""
+        for pair, new_count in new_counts.items():
+            stat = stats.get(pair)
+            if stat is None:
+                stat = CrawlStat(source=pair[0], term=pair[1], yield_avg=float(new_count))
+                db.add(stat)
+                stats[pair] = stat
+            else:
+                stat.yield_avg = self.ALPHA * new_count + (1 - self.ALPHA) * stat.yield_avg
+
+            stat.last_new_count = new_count
+            stat.last_crawled_at = now
+            if new_count:
+                stat.quiet_runs = 0
+                stat.next_crawl_at = None
+            else:
+                stat.quiet_runs = (stat.quiet_runs or 0) + 1
+                backoff = min(
+                    settings.CRAWL_BACKOFF_BASE_MINUTES * 2 ** (stat.quiet_runs - 1),
+                    settings.CRAWL_BACKOFF_MAX_MINUTES
+                )
+                stat.next_crawl_at = now + timedelta(minutes=backoff)
+
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error saving crawl stats: {e}")
+
+
+# Global planner instance
+crawl_planner = CrawlPlanner()
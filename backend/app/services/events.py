@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription(ABC):
+    """Stream of events for one connected client"""
+
+    @abstractmethod
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Wait up to timeout seconds for the next event (None on timeout)"""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+
+class EventBroker(ABC):
+    """Per-user pub/sub used to push new matches to connected clients"""
+
+    @abstractmethod
+    async def publish(self, user_id: str, event: dict) -> None:
+        pass
+
+    @abstractmethod
+    async def subscribe(self, user_id: str) -> Subscription:
+        pass
+
+
+class MemorySubscription(Subscription):
+    def __init__(self, broker: "MemoryEventBroker", user_id: str, max_pending: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def push(self, event: dict) -> None:
+        # A slow client loses its oldest events instead of growing the queue
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self.broker.subscribers[self.user_id].discard(self)
+        if not self.broker.subscribers[self.user_id]:
+            del self.broker.subscribers[self.user_id]
+
+
+class MemoryEventBroker(EventBroker):
+    """Delivers events published in this process only"""
+
+    def __init__(self, max_pending: int = 100):
+        self.max_pending = max_pending
+        self.subscribers: Dict[str, Set[MemorySubscription]] = defaultdict(set)
+
+    async def publish(self, user_id: str, event: dict) -> None:
+        for subscription in list(self.subscribers.get(user_id, ())):
+            subscription.push(event)
+
+    async def subscribe(self, user_id: str) -> Subscription:
+        subscription = MemorySubscription(self, user_id, self.max_pending)
+        self.subscribers[user_id].add(subscription)
+        return subscription
+
+
+class RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message["data"])
+
+    async def close(self) -> None:
+        await self.pubsub.unsubscribe()
+        await self.pubsub.aclose()
+
+
+class RedisEventBroker(EventBroker):
+    """Fans events out across API workers, including those published by Celery"""
+
+    def __init__(self, url: str, prefix: str = "ecoa:events:"):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.from_url(self.url, decode_responses=True)
+        return self._client
+
+    async def publish(self, user_id: str, event: dict) -> None:
+        await self.client.publish(self.prefix + user_id, json.dumps(event, default=str))
+
+    async def subscribe(self, user_id: str) -> Subscription:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.prefix + user_id)
+        return RedisSubscription(pubsub)
+
+
+def get_event_broker() -> EventBroker:
+    """Build the broker configured in EVENTS_BACKEND"""
+    if settings.EVENTS_BACKEND == "redis":
+        return RedisEventBroker(settings.REDIS_URL)
+    return MemoryEventBroker()
+
+
+async def publish_user_events(events_by_user: Dict[str, list]) -> None:
+    """Publish a batch of events, never letting push failures break ingestion"""
+    for user_id, events in events_by_user.items():
+        for event in events:
+            try:
+                await event_broker.publish(user_id, event)
+            except Exception as e:
+                logger.error(f"Error publishing event to {user_id}: {e}")
+
+
+# Global broker instance
+event_broker = get_event_broker()
@@ -0,0 +1,102 @@
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HostHealth:
+    """Observed behaviour of one host during the current job"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.circuit_open = False
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(fraction * (len(ordered) - 1))]
+
+
+class HostHealthTracker:
+    """
+    Per-host latency and failure tracking for the scrapers' fetch layer.
+
+    Timeouts adapt to each host: once enough requests succeeded, a request
+    may take FETCH_TIMEOUT_P95_MULTIPLIER times the host's p95 latency
+    (within FETCH_TIMEOUT_MIN_SECONDS and FETCH_TIMEOUT_SECONDS). A failure
+    is a URL that exhausted its retries; after FETCH_CIRCUIT_FAILURES
+    consecutive ones the host's circuit opens and its remaining requests
+    fail fast until reset() starts the next job.
+    """
+
+    WINDOW = 100
+    MIN_SAMPLES = 10
+
+    def __init__(self):
+        self.hosts: Dict[str, HostHealth] = {}
+
+    def _host(self, host: str) -> HostHealth:
+        if host not in self.hosts:
+            self.hosts[host] = HostHealth(self.WINDOW)
+        return self.hosts[host]
+
+    def timeout_for(self, host: str, attempt: int = 0) -> float:
+        """Timeout for a request, doubled on each retry in case the host just got slower"""
+        health = self._host(host)
+        timeout = settings.FETCH_TIMEOUT_SECONDS
+        if len(health.latencies) >= self.MIN_SAMPLES:
+            timeout = max(
+                settings.FETCH_TIMEOUT_MIN_SECONDS,
+                health.percentile(0.95) * settings.FETCH_TIMEOUT_P95_MULTIPLIER
+            )
+        return min(timeout * 2 ** attempt, settings.FETCH_TIMEOUT_SECONDS)
+
+    def is_open(self, host: str) -> bool:
+        return self._host(host).circuit_open
+
+    def record_success(self, host: str, latency: float) -> None:
+        health = self._host(host)
+        health.requests += 1
+        health.consecutive_failures = 0
+        health.latencies.append(latency)
+
+    def record_failure(self, host: str) -> None:
+        health = self._host(host)
+        health.requests += 1
+        health.failures += 1
+        health.consecutive_failures += 1
+        if not health.circuit_open and health.consecutive_failures >= settings.FETCH_CIRCUIT_FAILURES:
+            health.circuit_open = True
+            logger.warning(
+                f"Circuit open for {host} after {health.consecutive_failures} consecutive failed URLs, "
+                f"skipping it for the rest of the job"
+            )
+
+    def reset(self) -> None:
+        self.hosts.clear()
+
+    def report(self) -> Dict[str, Dict]:
+        report = {}
+        for host, health in self.hosts.items():
+            p50 = health.percentile(0.5)
+            p95 = health.percentile(0.95)
+            report[host] = {
+                "requests": health.requests,
+                "failures": health.failures,
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "timeout_s": round(self.timeout_for(host), 1),
+                "circuit_open": health.circuit_open,
+            }
+        return report
+
+
+# Global tracker instance
+host_health = HostHealthTracker()
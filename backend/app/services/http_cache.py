@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCache:
+    """
+    Bounded on-disk cache of scraper responses, with conditional revalidation.
+
+    One gzip-compressed JSON file per URL holds the body and its ETag and
+    Last-Modified validators. A cached page younger than its source's TTL
+    (HTTP_CACHE_TTL_SECONDS) is served without a request; an older one is
+    revalidated with If-None-Match / If-Modified-Since, and a 304 reuses it.
+    """
+
+    # Size is enforced every this many writes (and by prune())
+    ENFORCE_EVERY = 100
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, digest[:2], f"{digest}.json.gz")
+
+    def ttl_for(self, source: str) -> int:
+        ttls = settings.HTTP_CACHE_TTL_SECONDS
+        return ttls.get(source, ttls.get("default", 0))
+
+    def get(self, url: str) -> Optional[Dict]:
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Discarding unreadable cache entry for {url}: {e}")
+            return None
+        return entry if entry.get("url") == url else None
+
+    def is_fresh(self, entry: Dict, source: str) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl_for(source)
+
+    def conditional_headers(self, entry: Dict) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        entry = {
+            "url": url,
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        path = self._path(url)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(json.dumps(entry).encode("utf-8"), compresslevel=6))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error caching {url}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        self._writes += 1
+        if self._writes % self.ENFORCE_EVERY == 0:
+            self.prune()
+
+    def revalidated(self, url: str, entry: Dict) -> None:
+        """A 304 confirmed the entry: restart its freshness period"""
+        self.put(url, entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+    def prune(self) -> int:
+        """Evict the least recently stored entries until under max_bytes. Returns files removed."""
+        files = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+                removed += 1
+            except OSError as e:
+                logger.error(f"Error evicting {path}: {e}")
+        return removed
+
+    def record(self, source: str, outcome: str) -> None:
+        """
+        Count a fetch outcome: fresh (served from cache), revalidated (304),
+        stale (cached copy served because the host failed) or miss
+        """
+        self._stats[source][outcome] += 1
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Outcomes and hit ratio per source since the last reset_stats()"""
+        report = {}
+        for source, counts in self._stats.items():
+            total = sum(counts.values())
+            hits = counts["fresh"] + counts["revalidated"] + counts["stale"]
+            report[source] = {
+                "fresh": counts["fresh"],
+                "revalidated": counts["revalidated"],
+                "stale": counts["stale"],
+                "misses": counts["miss"],
+                "hit_ratio": round(hits / total, 3) if total else 0.0,
+            }
+        return report
+
+
+# Global cache instance
+http_cache = HttpCache(settings.HTTP_CACHE_DIR, settings.HTTP_CACHE_MAX_MB * 1024 * 1024)
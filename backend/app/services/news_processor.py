@@ -1,22 +1,33 @@
+import asyncio
 import logging
-import hashlib
-from typing import List, Dict
-from datetime import datetime
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, func, insert, or_, select, update
 from sqlalchemy.orm import Session
 
+from ..config import settings
 from ..database import SessionLocal
-from ..models import News, MonitoredTerm, NewsTermMatch, SentimentType
+from ..models import News, MonitoredTerm, NewsTermMatch, SentimentType, User, PlanType
 from .sentiment import analyze_news_sentiment
-from .scraper import G1Scraper, CNNScraper
+from .cache import response_cache
+from .checkpoints import JobCheckpoint, JobLeaseLost
+from .crawl_budget import crawl_planner
+from .fetch_health import host_health
+from .http_cache import http_cache
+from .events import publish_user_events
+from .scraper import G1Scraper, CNNScraper, ScrapedArticle
+from .scraper.article import get_url_hash
 from .scraper.twitter import TwitterScraper
 from .scraper.threads import ThreadsScraper
 
 logger = logging.getLogger(__name__)
 
 
-def get_url_hash(url: str) -> str:
-    """Generate SHA256 hash of URL for unique constraint"""
-    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+def count_term_occurrences(term: str, title: Optional[str], content: Optional[str]) -> int:
+    """Case-insensitive occurrences of a term in an article's title and content"""
+    term = term.lower()
+    return (title or "").lower().count(term) + (content or "").lower().count(term)
 
 
 class NewsProcessor:
@@ -34,18 +45,38 @@ class NewsProcessor:
         """Get a database session"""
         return SessionLocal()
 
-    async def get_all_monitored_terms(self) -> List[str]:
-        """Get all unique monitored terms from all users"""
+    async def get_all_monitored_terms(self, plan: Optional[PlanType] = None) -> List[str]:
+        """
+        Get all unique monitored terms from all users.
+        With a plan, only the terms that plan's crawl is responsible for:
+        PRO takes every term a PRO user monitors, FREE the remaining ones.
+        """
         db = self.get_db()
         try:
-            terms = db.query(MonitoredTerm.term).filter(
-                MonitoredTerm.is_active == True
-            ).distinct().all()
+            query = db.query(MonitoredTerm.term).filter(MonitoredTerm.is_active == True)
+            if plan is not None:
+                pro_terms = db.query(MonitoredTerm.term).join(User).filter(
+                    MonitoredTerm.is_active == True,
+                    User.plan_type == PlanType.PRO
+                )
+                if plan == PlanType.PRO:
+                    query = pro_terms
+                else:
+                    query = query.filter(MonitoredTerm.term.notin_(pro_terms.scalar_subquery()))
+            terms = query.distinct().all()
             return [t[0] for t in terms]
         finally:
             db.close()
 
-    async def scrape_all_sources(self, terms: List[str] = None) -> List[Dict]:
+    def get_active_term_rows(self, db: Session) -> List:
+        """Active terms as (id, term, user_id) rows"""
+        return db.query(
+            MonitoredTerm.id,
+            MonitoredTerm.term,
+            MonitoredTerm.user_id
+        ).filter(MonitoredTerm.is_active == True).all()
+
+    async def scrape_all_sources(self, terms: List[str] = None) -> List[ScrapedArticle]:
         """Scrape all news sources for the given terms"""
         if terms is None:
             terms = await self.get_all_monitored_terms()
@@ -70,29 +101,148 @@ class NewsProcessor:
 
         return all_articles
 
-    async def process_and_store(self, articles: List[Dict]) -> int:
+    async def scrape_with_budget(
+        self,
+        terms: List[str],
+        skip_pairs: Optional[set] = None,
+        on_pairs_done: Optional[Callable[[List, List[ScrapedArticle]], Awaitable[None]]] = None
+    ) -> Tuple[List[ScrapedArticle], Dict]:
+        """
+        Scrape every (source, term) pair within SCRAPE_FETCH_BUDGET article
+        fetches, shared out by crawl_planner according to each pair's yield.
+        Pairs in skip_pairs are left out; on_pairs_done, if given, is awaited
+        with each finished pair and its articles as the crawl goes.
+        Returns the articles and a report of the budgets used.
+        """
+        now = datetime.utcnow()
+        skip_pairs = skip_pairs or set()
+        pairs = [
+            (source_name, term)
+            for source_name in self.scrapers
+            for term in terms
+            if (source_name, term) not in skip_pairs
+        ]
+        semaphore = asyncio.Semaphore(settings.SCRAPE_CONCURRENCY)
+
+        async def list_new_urls(pair) -> Optional[List[str]]:
+            """URLs on the pair's first search page, or None if it could not be listed"""
+            source_name, term = pair
+            try:
+                async with semaphore:
+                    urls = await self.scrapers[source_name].get_article_urls(term)
+            except Exception as e:
+                logger.error(f"Error listing {source_name} for term '{term}': {e}")
+                return None
+            if urls is None:
+                return None
+            return list(dict.fromkeys(urls))
+
+        db = self.get_db()
+        try:
+            stats = crawl_planner.load_stats(db, pairs)
+            due = [pair for pair in pairs if crawl_planner.is_due(stats.get(pair), now)]
+
+            # First search page of every due pair; quiet pairs are backed off.
+            # Pairs whose listing failed (errors, open circuits) tell nothing
+            # about their yield, so they are left out and stay due
+            results = await asyncio.gather(*[list_new_urls(pair) for pair in due])
+            listed = {pair: urls for pair, urls in zip(due, results) if urls is not None}
+            failed = [pair for pair, urls in zip(due, results) if urls is None]
+
+            # Stored URLs are looked up once for all listings, not per pair
+            known = await self.known_urls([url for urls in listed.values() for url in urls])
+            listed = {pair: [url for url in urls if url not in known] for pair, urls in listed.items()}
+
+            # A URL listed under several terms is fetched only once
+            assigned = set()
+            available: Dict[Tuple[str, str], List[str]] = {}
+            for pair, urls in listed.items():
+                available[pair] = [url for url in urls if url not in assigned]
+                assigned.update(available[pair])
+
+            budgets = crawl_planner.allocate(
+                {pair: len(urls) for pair, urls in available.items()},
+                stats,
+                settings.SCRAPE_FETCH_BUDGET
+            )
+
+            crawl_planner.record(db, stats, {pair: len(urls) for pair, urls in listed.items()}, now)
+
+            # Pairs with nothing to fetch are finished already
+            if on_pairs_done:
+                await on_pairs_done([pair for pair in due if not budgets.get(pair)], [])
+
+            async def fetch_pair(pair, budget) -> List[ScrapedArticle]:
+                articles = await self.scrapers[pair[0]].fetch_articles(available[pair][:budget], pair[1], semaphore)
+                if on_pairs_done:
+                    await on_pairs_done([pair], articles)
+                return articles
+
+            fetched = await asyncio.gather(*[
+                fetch_pair(pair, budget)
+                for pair, budget in budgets.items()
+                if budget
+            ])
+            articles = [article for batch in fetched for article in batch]
+        finally:
+            db.close()
+
+        report = {
+            "fetch_budget": settings.SCRAPE_FETCH_BUDGET,
+            "fetches_used": sum(budgets.values()),
+            "pairs_crawled": len(listed),
+            "pairs_failed": len(failed),
+            "pairs_backed_off": len(pairs) - len(due),
+            "budgets": {
+                f"{source_name}:{term}": budget
+                for (source_name, term), budget in sorted(budgets.items(), key=lambda item: -item[1])
+                if budget
+            },
+        }
+        return articles, report
+
+    async def known_urls(self, urls: List[str]) -> set:
+        """Subset of urls already stored, queried off the event loop"""
+        if not urls:
+            return set()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._known_urls, urls)
+
+    def _known_urls(self, urls: List[str]) -> set:
+        by_hash = {get_url_hash(url): url for url in urls}
+        db = self.get_db()
+        try:
+            rows = db.query(News.url_hash).filter(News.url_hash.in_(list(by_hash))).all()
+            return {by_hash[row.url_hash] for row in rows}
+        finally:
+            db.close()
+
+    async def process_and_store(self, articles: List[ScrapedArticle]) -> int:
         """Process articles (sentiment analysis) and store in database"""
         db = self.get_db()
         stored_count = 0
 
+        # Events pushed to connected users once the batch is stored
+        events_by_user: Dict[str, list] = defaultdict(list)
+        new_matches_by_user: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        new_matches_by_term: Dict[str, int] = defaultdict(int)
+
         try:
+            # Active terms are loaded once for the whole batch, as plain rows
+            # so the per-article commits below don't expire them
+            terms = self.get_active_term_rows(db)
+
             for article in articles:
                 try:
-                    # Generate URL hash
-                    url_hash = get_url_hash(article["url"])
-
                     # Check if article already exists (by URL hash)
-                    existing = db.query(News).filter(News.url_hash == url_hash).first()
+                    existing = db.query(News).filter(News.url_hash == article.url_hash).first()
 
                     if existing:
-                        logger.debug(f"Article already exists: {article['url']}")
+                        logger.debug(f"Article already exists: {article.url}")
                         continue
 
                     # Analyze sentiment
-                    sentiment_str, sentiment_score = analyze_news_sentiment(
-                        article.get("title", ""),
-                        article.get("content")
-                    )
+                    sentiment_str, sentiment_score = analyze_news_sentiment(article.title, article.content)
 
                     # Convert sentiment string to enum
                     sentiment = None
@@ -103,107 +253,390 @@ class NewsProcessor:
                     elif sentiment_str == "neutral":
                         sentiment = SentimentType.NEUTRAL
 
-                    # Parse published_at if it's a string
-                    published_at = article.get("published_at")
-                    if isinstance(published_at, str):
-                        try:
-                            published_at = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
-                        except:
-                            published_at = None
-
                     # Create news entry
                     news = News(
-                        title=article["title"],
-                        summary=article.get("summary"),
-                        content=article.get("content"),
-                        url=article["url"],
-                        url_hash=url_hash,
-                        image_url=article.get("image_url"),
-                        author=article.get("author"),
-                        source=article["source"],
-                        published_at=published_at,
-                        scraped_at=datetime.utcnow(),
+                        title=article.title,
+                        summary=article.summary,
+                        content=article.content,
+                        url=article.url,
+                        url_hash=article.url_hash,
+                        image_url=article.image_url,
+                        author=article.author,
+                        source=article.source,
+                        published_at=article.published_at,
+                        scraped_at=article.scraped_at,
                         sentiment=sentiment,
                         sentiment_score=sentiment_score,
+                        raw_html_hash=article.raw_html_hash,
                     )
 
                     db.add(news)
+                    db.flush()
+
+                    # The news and its term matches commit together: a job
+                    # killed in between must not leave a stored, unmatched
+                    # news that its resumed run would skip as existing
+                    news_id = news.id
+                    matched = await self.create_term_matches(db, news_id, article, terms)
                     db.commit()
-                    db.refresh(news)
 
                     stored_count += 1
 
-                    # Create term matches
-                    await self.create_term_matches(db, news.id, article)
+                    matched_by_user: Dict[str, List[str]] = defaultdict(list)
+                    for term_data in matched:
+                        matched_by_user[term_data.user_id].append(term_data.term)
+                        new_matches_by_user[term_data.user_id][term_data.term] += 1
+                        new_matches_by_term[term_data.id] += 1
+
+                    for user_id, user_terms in matched_by_user.items():
+                        events_by_user[user_id].append({
+                            "type": "news_match",
+                            "news": {
+                                "id": news_id,
+                                "title": article.title,
+                                "summary": article.summary,
+                                "url": article.url,
+                                "image_url": article.image_url,
+                                "source": article.source,
+                                "sentiment": sentiment.value if sentiment else None,
+                                "published_at": article.published_at.isoformat() if article.published_at else None,
+                                "matched_terms": user_terms,
+                            },
+                        })
 
                 except Exception as e:
                     db.rollback()
-                    logger.error(f"Error processing article {article.get('url')}: {e}")
+                    logger.error(f"Error processing article {article.url}: {e}")
 
             logger.info(f"Stored {stored_count} new articles")
+
+            self.bump_term_counters(db, new_matches_by_term)
+
+            # Cached dashboards become stale once new articles land
+            if stored_count:
+                await response_cache.mark_ingest()
+
+            for user_id, term_counts in new_matches_by_user.items():
+                events_by_user[user_id].append({
+                    "type": "counters",
+                    "new_matches": sum(term_counts.values()),
+                    "terms": dict(term_counts),
+                })
+            await publish_user_events(events_by_user)
+
             return stored_count
         finally:
             db.close()
 
-    async def create_term_matches(self, db: Session, news_id: str, article: Dict):
-        """Create matches between news and monitored terms"""
+    async def create_term_matches(
+        self,
+        db: Session,
+        news_id: str,
+        article: ScrapedArticle,
+        terms: Optional[List] = None
+    ) -> List:
+        """
+        Add matches between a news row just added and the monitored terms,
+        in the caller's transaction. Returns the matched term rows.
+        """
         # Get all active monitored terms
-        terms = db.query(MonitoredTerm).filter(MonitoredTerm.is_active == True).all()
+        if terms is None:
+            terms = self.get_active_term_rows(db)
 
-        if not terms:
-            return
+        matched = []
 
-        title_lower = (article.get("title") or "").lower()
-        content_lower = (article.get("content") or "").lower()
+        if not terms:
+            return matched
 
         for term_data in terms:
-            term = term_data.term.lower()
             term_id = term_data.id
 
             # Count occurrences
-            count = title_lower.count(term) + content_lower.count(term)
+            count = count_term_occurrences(term_data.term, article.title, article.content)
 
             if count > 0:
-                try:
-                    # Check if match already exists
-                    existing = db.query(NewsTermMatch).filter(
-                        NewsTermMatch.news_id == news_id,
-                        NewsTermMatch.term_id == term_id
-                    ).first()
-
-                    if not existing:
-                        match = NewsTermMatch(
-                            news_id=news_id,
-                            term_id=term_id,
-                            match_count=count
-                        )
-                        db.add(match)
-                        db.commit()
-                except Exception as e:
+                db.add(NewsTermMatch(
+                    news_id=news_id,
+                    term_id=term_id,
+                    match_count=count
+                ))
+                matched.append(term_data)
+
+        return matched
+
+    def bump_term_counters(self, db: Session, counts: Dict[str, int]) -> None:
+        """Add a batch of new matches to the counters on each term, in one statement"""
+        if not counts:
+            return
+
+        table = MonitoredTerm.__table__
+        statement = update(table).where(
+            table.c.id == bindparam("b_term_id")
+        ).values(
+            match_total=table.c.match_total + bindparam("b_count"),
+            last_matched_at=bindparam("b_matched_at"),
+            # Counter bumps are not edits to the term itself
+            updated_at=table.c.updated_at
+        )
+
+        matched_at = datetime.utcnow()
+        try:
+            db.execute(statement, [
+                {"b_term_id": term_id, "b_count": count, "b_matched_at": matched_at}
+                for term_id, count in counts.items()
+            ])
+            db.commit()
+        except Exception as e:
+            # The matches themselves are stored; the repair job fixes the counters
+            db.rollback()
+            logger.error(f"Error updating term counters: {e}")
+
+    def backfill_term_matches(
+        self,
+        term_id: str,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Match a term against the news already stored, scanning ecoa_news in
+        primary-key chunks. Matches of a renamed term's old text are dropped
+        by the rename itself. The task stops as soon as the term is renamed
+        again or deactivated, leaving the rest to the backfill that change
+        queues. progress, if given, receives a status dict after every chunk.
+        """
+        chunk_size = settings.BACKFILL_CHUNK_SIZE
+        db = self.get_db()
+        try:
+            term_row = db.query(MonitoredTerm.term, MonitoredTerm.is_active).filter(
+                MonitoredTerm.id == term_id
+            ).first()
+            if not term_row:
+                return {"term_id": term_id, "status": "missing"}
+            if not term_row.is_active:
+                return {"term_id": term_id, "term": term_row.term, "status": "inactive"}
+            term = term_row.term
+            db.commit()
+
+            status = {
+                "term_id": term_id,
+                "term": term,
+                "total": db.scalar(select(func.count(News.id))),
+                "scanned": 0,
+                "matched": 0,
+            }
+            last_id = ""
+
+            while True:
+                chunk = db.execute(
+                    select(News.id, News.title, News.content).where(
+                        News.id > last_id
+                    ).order_by(News.id).limit(chunk_size)
+                ).all()
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+
+                counts = {}
+                for row in chunk:
+                    count = count_term_occurrences(term, row.title, row.content)
+                    if count > 0:
+                        counts[row.id] = count
+
+                # The term row lock orders this chunk with renames (update_filter
+                # locks it too), so no match of a superseded text is written
+                current = db.query(MonitoredTerm.term, MonitoredTerm.is_active).filter(
+                    MonitoredTerm.id == term_id
+                ).with_for_update().first()
+                if not current or current.term != term or not current.is_active:
                     db.rollback()
-                    logger.error(f"Error creating term match: {e}")
+                    status["status"] = "superseded"
+                    logger.info(f"Backfill of term '{term}' stopped: the term changed")
+                    return status
+
+                inserted = 0
+                if counts:
+                    # Ingestion, or another backfill, may have matched some of
+                    # these already: skip them instead of failing the chunk
+                    result = db.execute(
+                        insert(NewsTermMatch.__table__)
+                        .prefix_with("IGNORE", dialect="mysql")
+                        .prefix_with("OR IGNORE", dialect="sqlite"),
+                        [
+                            {"news_id": news_id, "term_id": term_id, "match_count": count}
+                            for news_id, count in counts.items()
+                        ]
+                    )
+                    inserted = max(result.rowcount, 0)
+                db.commit()
+                if inserted:
+                    self.bump_term_counters(db, {term_id: inserted})
+                    status["matched"] += inserted
+
+                status["scanned"] += len(chunk)
+                if progress:
+                    progress(dict(status))
+
+            status["status"] = "completed"
+            logger.info(f"Backfilled {status['matched']} matches for term '{term}'")
+            return status
+        finally:
+            db.close()
 
-    async def run_scraping_job(self) -> Dict:
-        """Run a complete scraping job"""
+    def reconcile_term_counters(self) -> int:
+        """Recompute every term's counters from the match table. Returns the number of terms fixed."""
+        table = MonitoredTerm.__table__
+        matches = NewsTermMatch.__table__
+        match_total = select(func.count(matches.c.id)).where(
+            matches.c.term_id == table.c.id
+        ).scalar_subquery()
+        last_matched_at = select(func.max(matches.c.created_at)).where(
+            matches.c.term_id == table.c.id
+        ).scalar_subquery()
+
+        db = self.get_db()
+        try:
+            result = db.execute(
+                update(table).where(or_(
+                    table.c.match_total != match_total,
+                    table.c.last_matched_at.is_distinct_from(last_matched_at)
+                )).values(
+                    match_total=match_total,
+                    last_matched_at=last_matched_at,
+                    updated_at=table.c.updated_at
+                )
+            )
+            db.commit()
+            logger.info(f"Reconciled counters of {result.rowcount} terms")
+            return result.rowcount
+        finally:
+            db.close()
+
+    async def run_deep_crawl(
+        self,
+        terms: List[str],
+        max_pages: Optional[int] = None,
+        days: Optional[int] = None
+    ) -> Dict:
+        """Walk several search result pages per term to fill in older history"""
         start_time = datetime.utcnow()
+        max_pages = max_pages or settings.DEEP_CRAWL_MAX_PAGES
+        since = start_time - timedelta(days=days or settings.DEEP_CRAWL_DAYS)
 
-        # Scrape all sources
-        articles = await self.scrape_all_sources()
+        found_count = 0
+        stored_count = 0
+        host_health.reset()
+
+        for term in terms:
+            articles = []
+            for source_name, scraper in self.scrapers.items():
+                if not scraper.supports_paging:
+                    continue
+                try:
+                    articles.extend(await scraper.deep_scrape(
+                        term,
+                        max_pages,
+                        since,
+                        self.known_urls,
+                        settings.DEEP_CRAWL_CONCURRENCY
+                    ))
+                except Exception as e:
+                    logger.error(f"Error deep scraping {source_name} for term '{term}': {e}")
 
-        # Process and store
-        stored_count = await self.process_and_store(articles)
+            # Store per term so a long crawl never holds every article at once
+            found_count += len(articles)
+            stored_count += await self.process_and_store(articles)
 
         end_time = datetime.utcnow()
-        duration = (end_time - start_time).total_seconds()
 
         return {
             "status": "completed",
-            "articles_found": len(articles),
+            "terms": terms,
+            "articles_found": found_count,
             "articles_stored": stored_count,
-            "duration_seconds": duration,
-            "timestamp": end_time.isoformat()
+            "duration_seconds": (end_time - start_time).total_seconds(),
+            "timestamp": end_time.isoformat(),
+            "hosts": host_health.report()
         }
 
+    async def run_scraping_job(self, plan: Optional[PlanType] = None, owner: Optional[str] = None) -> Dict:
+        """
+        Run a complete scraping job, optionally only for one plan's terms.
+        Progress is checkpointed per (source, term), so a job interrupted
+        halfway is resumed by its redelivery (same owner, the Celery task id)
+        or, once its lease lapses, by the next run with the same plan.
+        """
+        start_time = datetime.utcnow()
+        plan_name = plan.value if plan else None
+
+        db = self.get_db()
+        heartbeat = None
+        try:
+            checkpoint = JobCheckpoint.acquire(db, f"plan:{plan_name or 'all'}", owner)
+            if checkpoint is None:
+                logger.info(f"Scraping job for plan {plan_name} is still running elsewhere, skipping")
+                return {"status": "skipped", "plan": plan_name, "reason": "job already running"}
+
+            # Keep the lease while listing and fetching, not only as units finish
+            async def keep_alive() -> None:
+                loop = asyncio.get_running_loop()
+                while True:
+                    await asyncio.sleep(settings.SCRAPE_JOB_HEARTBEAT_SECONDS)
+                    if not await loop.run_in_executor(None, checkpoint.heartbeat):
+                        logger.warning(f"Scraping job for plan {plan_name} lost its lease")
+                        return
+
+            heartbeat = asyncio.create_task(keep_alive())
+
+            # Workers run one job at a time, so the counters cover this job
+            http_cache.reset_stats()
+            host_health.reset()
+
+            # Articles an interrupted run fetched but never stored
+            pending = checkpoint.pending_articles
+            if pending:
+                checkpoint.articles_stored(await self.process_and_store(pending))
+
+            # Storing is serialized so the checkpoint always matches what was stored
+            store_lock = asyncio.Lock()
+
+            async def on_pairs_done(pairs: List, articles: List[ScrapedArticle]) -> None:
+                async with store_lock:
+                    checkpoint.units_fetched(pairs, articles)
+                    if articles:
+                        checkpoint.articles_stored(await self.process_and_store(articles))
+
+            # Scrape all sources, within the job's fetch budget
+            terms = await self.get_all_monitored_terms(plan)
+            articles, budget_report = await self.scrape_with_budget(
+                terms,
+                skip_pairs=checkpoint.done_units,
+                on_pairs_done=on_pairs_done
+            )
+            checkpoint.complete()
+
+            end_time = datetime.utcnow()
+            duration = (end_time - start_time).total_seconds()
+
+            return {
+                "status": "completed",
+                "plan": plan_name,
+                "resumed": checkpoint.resumed,
+                "attempts": checkpoint.job.attempts,
+                "articles_found": checkpoint.job.articles_found,
+                "articles_stored": checkpoint.job.articles_stored,
+                "duration_seconds": duration,
+                "timestamp": end_time.isoformat(),
+                "crawl": budget_report,
+                "http_cache": http_cache.stats(),
+                "hosts": host_health.report()
+            }
+        except JobLeaseLost as e:
+            logger.error(str(e))
+            return {"status": "aborted", "plan": plan_name, "reason": "job taken over by another run"}
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+            db.close()
+
 
 # Global processor instance
 news_processor = NewsProcessor()
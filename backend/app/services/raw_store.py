@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used without it
+    zstandard = None
+
+
+class RawHtmlStore:
+    """
+    Content-addressed store of fetched article HTML, compressed on disk.
+
+    Files live under root/ab/cd/<sha256>.<ext>, so identical pages are kept
+    once. News rows reference their page by digest (News.raw_html_hash),
+    which lets scripts.reparse run newer extractors without the network.
+    """
+
+    def __init__(self, root: str, codec: str = "gzip"):
+        self.root = root
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, storing raw HTML with gzip")
+            codec = "gzip"
+        self.codec = codec
+
+    def _path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.{ext}")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def put(self, html: str) -> str:
+        """Store a page and return its digest"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        ext = "zst" if self.codec == "zstd" else "gz"
+        path = self._path(digest, ext)
+        if os.path.exists(path):
+            # Refresh the mtime so retention counts from the last fetch
+            os.utime(path)
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._compress(data))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """Load a stored page, whichever codec it was written with"""
+        path = self._path(digest, "zst")
+        if os.path.exists(path):
+            if zstandard is None:
+                logger.error(f"Raw HTML {digest} is zstd-compressed but zstandard is not installed")
+                return None
+            with open(path, "rb") as f:
+                return zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+        path = self._path(digest, "gz")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return gzip.decompress(f.read()).decode("utf-8")
+        return None
+
+    def prune(self, retention_days: int) -> int:
+        """Delete pages not fetched within retention_days. Returns the number removed."""
+        cutoff = time.time() - retention_days * 24 * 60 * 60
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except OSError as e:
+                    logger.error(f"Error pruning {path}: {e}")
+        return removed
+
+
+# Global store instance
+raw_html_store = RawHtmlStore(settings.RAW_HTML_STORE_DIR, settings.RAW_HTML_CODEC)
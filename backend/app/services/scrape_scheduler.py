@@ -0,0 +1,96 @@
+import logging
+from typing import List
+
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..models import PlanType
+
+logger = logging.getLogger(__name__)
+
+# Redis keys shared by the API (which requests scrapes) and the Celery task
+# (which runs them). Terms wait in PENDING until the debounced task claims
+# them; SCHEDULED exists while a task is queued; INFLIGHT holds the terms
+# currently being crawled. PENDING and SCHEDULED are per plan (":pro",
+# ":free"), since each plan's batch runs on that plan's queue.
+PENDING_KEY = "ecoa:scrape:pending"
+SCHEDULED_KEY = "ecoa:scrape:scheduled"
+INFLIGHT_KEY = "ecoa:scrape:inflight"
+
+# Upper bound for a batch crawl; keeps keys from leaking if a worker dies
+INFLIGHT_TTL_SECONDS = 30 * 60
+# How late a queued task may start before another one can be scheduled
+SCHEDULE_GRACE_SECONDS = 120
+
+_async_client = None
+
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        import redis.asyncio as redis
+        _async_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_client
+
+
+def get_sync_client():
+    import redis
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def request_term_scrape(term: str, plan: PlanType) -> bool:
+    """
+    Ask for an immediate scrape of a term newly monitored by a user on plan.
+
+    Requests arriving within ON_DEMAND_SCRAPE_DEBOUNCE_SECONDS are coalesced
+    into a single task per plan, run on that plan's queue. Returns True if
+    the term was queued.
+    """
+    from ..tasks.scraping import queue_for_plan, scrape_pending_terms_task
+
+    try:
+        client = get_async_client()
+        if await client.sismember(INFLIGHT_KEY, term):
+            return False
+
+        await client.sadd(f"{PENDING_KEY}:{plan.value}", term)
+
+        # Only the first request of a window queues the task
+        debounce = settings.ON_DEMAND_SCRAPE_DEBOUNCE_SECONDS
+        if await client.set(f"{SCHEDULED_KEY}:{plan.value}", "1", nx=True, ex=debounce + SCHEDULE_GRACE_SECONDS):
+            # Publishing to the broker is blocking I/O, kept off the event loop
+            await run_in_threadpool(
+                scrape_pending_terms_task.apply_async,
+                args=(plan.value,),
+                countdown=debounce,
+                queue=queue_for_plan(plan)
+            )
+        return True
+    except Exception as e:
+        logger.error(f"Error requesting scrape for term '{term}': {e}")
+        return False
+
+
+def claim_pending_terms(client, plan: PlanType) -> List[str]:
+    """Take every term pending for plan, not already being crawled, and mark it in flight"""
+    # Clear the flag first: terms requested from now on start a new window
+    client.delete(f"{SCHEDULED_KEY}:{plan.value}")
+
+    pipe = client.pipeline()
+    pipe.smembers(f"{PENDING_KEY}:{plan.value}")
+    pipe.delete(f"{PENDING_KEY}:{plan.value}")
+    pipe.smembers(INFLIGHT_KEY)
+    pending, _, inflight = pipe.execute()
+
+    terms = sorted(set(pending) - set(inflight))
+    if terms:
+        pipe = client.pipeline()
+        pipe.sadd(INFLIGHT_KEY, *terms)
+        pipe.expire(INFLIGHT_KEY, INFLIGHT_TTL_SECONDS)
+        pipe.execute()
+    return terms
+
+
+def release_terms(client, terms: List[str]) -> None:
+    if terms:
+        client.srem(INFLIGHT_KEY, *terms)
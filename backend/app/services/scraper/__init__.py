@@ -1,6 +1,7 @@
 # Scraper package
+from .article import ScrapedArticle
 from .base import BaseScraper
 from .g1 import G1Scraper
 from .cnn import CNNScraper
 
-__all__ = ["BaseScraper", "G1Scraper", "CNNScraper"]
+__all__ = ["ScrapedArticle", "BaseScraper", "G1Scraper", "CNNScraper"]
@@ -0,0 +1,80 @@
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+
+def get_url_hash(url: str) -> str:
+    """Generate SHA256 hash of URL for unique constraint"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def parse_iso_datetime(value: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 string (a trailing Z included) to datetime, None if unparseable"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class ScrapedArticle:
+    """
+    An article as extracted by a scraper, on its way to ecoa_news.
+
+    Dates are parsed once, at extraction, and url_hash is computed with the
+    record, so storing it needs no further conversion. Slots keep a job's
+    worth of articles compact in memory.
+    """
+
+    url: str
+    title: str
+    source: str
+    summary: Optional[str] = None
+    content: Optional[str] = None
+    author: Optional[str] = None
+    image_url: Optional[str] = None
+    published_at: Optional[datetime] = None
+    raw_html_hash: Optional[str] = None
+    # Monitored term whose search found the article
+    term: Optional[str] = None
+    scraped_at: datetime = field(default_factory=datetime.utcnow)
+    url_hash: str = field(init=False)
+
+    def __post_init__(self):
+        self.url_hash = get_url_hash(self.url)
+
+    def to_json(self) -> Dict:
+        """Plain dict for JSON columns (job checkpoints)"""
+        return {
+            "url": self.url,
+            "title": self.title,
+            "source": self.source,
+            "summary": self.summary,
+            "content": self.content,
+            "author": self.author,
+            "image_url": self.image_url,
+            "published_at": self.published_at.isoformat() if self.published_at else None,
+            "raw_html_hash": self.raw_html_hash,
+            "term": self.term,
+            "scraped_at": self.scraped_at.isoformat(),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "ScrapedArticle":
+        """Inverse of to_json; also reads checkpoints saved before this record type existed"""
+        return cls(
+            url=data["url"],
+            title=data["title"],
+            source=data["source"],
+            summary=data.get("summary"),
+            content=data.get("content"),
+            author=data.get("author"),
+            image_url=data.get("image_url"),
+            published_at=parse_iso_datetime(data.get("published_at")),
+            raw_html_hash=data.get("raw_html_hash"),
+            term=data.get("term"),
+            scraped_at=parse_iso_datetime(data.get("scraped_at")) or datetime.utcnow(),
+        )
@@ -1,23 +1,47 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Awaitable, Callable, List, Dict, Optional, Set
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import asyncio
+import random
+import time
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import logging
 
+from ...config import settings
+from ..fetch_health import host_health
+from ..http_cache import http_cache
+from ..raw_store import raw_html_store
+from .article import ScrapedArticle, parse_iso_datetime
+from .structured import extract_structured
+
 logger = logging.getLogger(__name__)
 
+# Responses worth retrying: rate limiting and server-side errors
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Fields of an extracted article, besides its url
+ARTICLE_FIELDS = ("title", "summary", "content", "author", "published_at", "image_url")
+MAX_CONTENT_LENGTH = 5000
+
 
 class BaseScraper(ABC):
     """Base class for all news scrapers"""
 
+    # Whether get_article_urls accepts page > 1 (used by deep_scrape)
+    supports_paging = False
+
+    # CSS class of the article body element, parsed alone when structured
+    # data already gives every other field
+    content_class: Optional[str] = None
+
     def __init__(self):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
         }
-        self.timeout = 30.0
 
     @property
     @abstractmethod
@@ -32,35 +56,173 @@ class BaseScraper(ABC):
         pass
 
     @abstractmethod
-    async def get_article_urls(self, search_term: str) -> List[str]:
-        """Get list of article URLs for a search term"""
+    async def get_article_urls(self, search_term: str, page: int = 1) -> Optional[List[str]]:
+        """
+        Get list of article URLs for a search term, from the given results
+        page, or None if the page could not be fetched
+        """
         pass
 
-    @abstractmethod
-    async def parse_article(self, url: str) -> Optional[Dict]:
-        """Parse a single article and return its data"""
-        pass
+    def extract_from_dom(self, soup: BeautifulSoup, url: str) -> Dict:
+        """Article fields found with the source's CSS selectors (any may be None)"""
+        return {}
 
-    async def fetch_page(self, url: str) -> Optional[str]:
-        """Fetch HTML content from a URL"""
+    def extract_article(self, html: str, url: str) -> Optional[ScrapedArticle]:
+        """
+        Extract article data from a fetched page. Pure function of the HTML
+        (no network), so scripts.reparse can run it over stored pages.
+
+        JSON-LD and OpenGraph data is read first, without building a DOM,
+        and the selectors of extract_from_dom only fill the fields it lacks.
+        When that is just the body, only the element with content_class is
+        parsed instead of the whole page.
+        """
         try:
-            async with httpx.AsyncClient(
-                headers=self.headers,
-                timeout=self.timeout,
-                follow_redirects=True
-            ) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                return response.text
+            article = extract_structured(html)
+            missing = [field for field in ARTICLE_FIELDS if not article[field]]
+
+            if missing == ["content"] and self.content_class:
+                body = BeautifulSoup(html, "lxml", parse_only=self._content_strainer())
+                article["content"] = self.extract_from_dom(body, url).get("content")
+                if article["content"]:
+                    missing = []
+
+            if missing:
+                found = self.extract_from_dom(self.parse_html(html), url)
+                for field in missing:
+                    article[field] = found.get(field)
         except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
+            logger.error(f"Error parsing {self.source_name} article {url}: {e}")
             return None
 
+        if not article["title"]:
+            return None
+
+        return ScrapedArticle(
+            url=url,
+            title=article["title"],
+            source=self.source_name,
+            summary=article["summary"],
+            content=article["content"][:MAX_CONTENT_LENGTH] if article["content"] else None,
+            author=article["author"],
+            image_url=article["image_url"],
+            published_at=parse_iso_datetime(article["published_at"])
+        )
+
+    def _content_strainer(self) -> SoupStrainer:
+        # A class_ string only matches the exact attribute value, not one class among several
+        return SoupStrainer(class_=lambda value: value is not None and self.content_class in value.split())
+
+    async def parse_article(self, url: str) -> Optional[ScrapedArticle]:
+        """Fetch and parse a single article, keeping its raw HTML"""
+        html = await self.fetch_page(url)
+        if not html:
+            return None
+
+        raw_html_hash = None
+        if settings.RAW_HTML_ENABLED:
+            try:
+                raw_html_hash = raw_html_store.put(html)
+            except Exception as e:
+                logger.error(f"Error storing raw HTML for {url}: {e}")
+
+        article = self.extract_article(html, url)
+        if article:
+            article.raw_html_hash = raw_html_hash
+        return article
+
+    async def fetch_page(self, url: str) -> Optional[str]:
+        """
+        Fetch HTML content from a URL, through the HTTP cache.
+
+        Timeouts, connection errors, 429 and 5xx responses are retried with
+        jittered exponential backoff; each attempt's timeout comes from the
+        host's observed latency (see fetch_health). A URL still failing after
+        its retries counts as one failure of the host, and once the host's
+        circuit is open its URLs fail immediately for the rest of the job.
+        When the host cannot be reached (retries exhausted, circuit open), a
+        cached copy, however old, is served instead; any other error returns
+        None.
+        """
+        cached = http_cache.get(url) if settings.HTTP_CACHE_ENABLED else None
+        if cached and http_cache.is_fresh(cached, self.source_name):
+            http_cache.record(self.source_name, "fresh")
+            return cached["body"]
+
+        host = urlparse(url).hostname or ""
+        for attempt in range(settings.FETCH_RETRIES + 1):
+            if host_health.is_open(host):
+                logger.debug(f"Skipping {url}: circuit open for {host}")
+                return self._serve_stale(cached)
+
+            started = time.monotonic()
+            try:
+                async with httpx.AsyncClient(
+                    headers=self.headers,
+                    timeout=host_health.timeout_for(host, attempt),
+                    follow_redirects=True
+                ) as client:
+                    response = await client.get(
+                        url,
+                        headers=http_cache.conditional_headers(cached) if cached else None
+                    )
+            except httpx.TransportError as e:
+                # Timeouts, refused or reset connections, DNS failures
+                response = None
+                error = f"{type(e).__name__}: {e}"
+            except Exception as e:
+                logger.error(f"Error fetching {url}: {e}")
+                return None
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    host_health.record_success(host, time.monotonic() - started)
+                    break
+                error = f"HTTP {response.status_code}"
+
+            if attempt == settings.FETCH_RETRIES or host_health.is_open(host):
+                # Counted once per URL, so a single slow page retrying cannot
+                # open the host's circuit by itself
+                host_health.record_failure(host)
+                logger.error(f"Error fetching {url} after {attempt + 1} attempts: {error}")
+                return self._serve_stale(cached)
+            # Full jitter, so concurrent fetches to the host don't retry in lockstep
+            delay = random.uniform(0, settings.FETCH_RETRY_BASE_SECONDS * 2 ** attempt)
+            logger.warning(f"Error fetching {url} ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        if cached and response.status_code == 304:
+            http_cache.revalidated(url, cached)
+            http_cache.record(self.source_name, "revalidated")
+            return cached["body"]
+
+        if response.is_error:
+            # The host answered: a 404 or 410 means the page is gone, not
+            # that an old copy should stand in for it
+            logger.error(f"Error fetching {url}: HTTP {response.status_code}")
+            return None
+
+        if settings.HTTP_CACHE_ENABLED:
+            http_cache.put(
+                url,
+                response.text,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified")
+            )
+            http_cache.record(self.source_name, "miss")
+        return response.text
+
+    def _serve_stale(self, cached: Optional[Dict]) -> Optional[str]:
+        """Body of an expired cache entry, served when the origin cannot be reached"""
+        if not cached:
+            return None
+        http_cache.record(self.source_name, "stale")
+        return cached["body"]
+
     def parse_html(self, html: str) -> BeautifulSoup:
         """Parse HTML string into BeautifulSoup object"""
         return BeautifulSoup(html, "lxml")
 
-    async def scrape(self, search_terms: List[str]) -> List[Dict]:
+    async def scrape(self, search_terms: List[str]) -> List[ScrapedArticle]:
         """
         Main scraping method.
         Searches for articles matching the given terms.
@@ -70,7 +232,7 @@ class BaseScraper(ABC):
 
         for term in search_terms:
             try:
-                urls = await self.get_article_urls(term)
+                urls = await self.get_article_urls(term) or []
                 logger.info(f"Found {len(urls)} URLs for term '{term}' on {self.source_name}")
 
                 for url in urls[:10]:  # Limit to 10 articles per term
@@ -81,8 +243,7 @@ class BaseScraper(ABC):
                     article = await self.parse_article(url)
 
                     if article:
-                        article["source"] = self.source_name
-                        article["scraped_at"] = datetime.utcnow().isoformat()
+                        article.term = term
                         all_articles.append(article)
 
             except Exception as e:
@@ -90,6 +251,110 @@ class BaseScraper(ABC):
 
         return all_articles
 
+    async def fetch_articles(
+        self,
+        urls: List[str],
+        search_term: str,
+        semaphore: asyncio.Semaphore
+    ) -> List[ScrapedArticle]:
+        """Parse article URLs concurrently, tagging each article with its term"""
+        async def fetch(url: str) -> Optional[ScrapedArticle]:
+            async with semaphore:
+                try:
+                    return await self.parse_article(url)
+                except Exception as e:
+                    logger.error(f"Error parsing {url}: {e}")
+                    return None
+
+        articles = []
+        for article in await asyncio.gather(*[fetch(url) for url in urls]):
+            if article:
+                article.term = search_term
+                articles.append(article)
+        return articles
+
+    async def deep_scrape(
+        self,
+        search_term: str,
+        max_pages: int,
+        since: datetime,
+        known_urls: Callable[[List[str]], Awaitable[Set[str]]],
+        concurrency: int = 4
+    ) -> List[ScrapedArticle]:
+        """
+        Walk up to max_pages search result pages for a term, for backfill.
+
+        Pages are fetched in waves of `concurrency`, and the articles of each
+        wave are parsed concurrently too. Walking stops at the end of the
+        results, once a wave has nothing published after `since`, or when,
+        after finding new articles, it reaches a page whose URLs are all
+        already stored (known_urls returns the subset it knows): results are
+        ordered by date, so that history was covered by an earlier crawl.
+        The first pages are usually known from the incremental crawl, so
+        they never stop the walk by themselves.
+        """
+        if not self.supports_paging:
+            return []
+
+        semaphore = asyncio.Semaphore(concurrency)
+        articles = []
+        seen_urls = set()
+        found_new = False
+
+        async def limited(coro):
+            async with semaphore:
+                return await coro
+
+        for first_page in range(1, max_pages + 1, concurrency):
+            pages = range(first_page, min(first_page + concurrency, max_pages + 1))
+            page_urls = await asyncio.gather(*[
+                limited(self.get_article_urls(search_term, page)) for page in pages
+            ])
+
+            stop = False
+            wave_urls = []
+            for urls in page_urls:
+                if not urls:
+                    stop = True
+                    break
+                known = await known_urls(urls)
+                if len(known) == len(set(urls)):
+                    if found_new:
+                        stop = True
+                        break
+                else:
+                    found_new = True
+                wave_urls.extend(url for url in urls if url not in known and url not in seen_urls)
+                seen_urls.update(urls)
+
+            parsed = await asyncio.gather(*[limited(self.parse_article(url)) for url in wave_urls])
+
+            recent_in_wave = 0
+            for article in parsed:
+                if not article:
+                    continue
+                published_at = self.as_naive_utc(article.published_at)
+                if published_at and published_at < since:
+                    continue
+                recent_in_wave += 1
+                article.term = search_term
+                articles.append(article)
+
+            logger.info(
+                f"Deep scrape of '{search_term}' on {self.source_name}: pages "
+                f"{pages.start}-{pages.stop - 1}, {recent_in_wave} articles kept"
+            )
+            if stop or (wave_urls and not recent_in_wave):
+                break
+
+        return articles
+
+    def as_naive_utc(self, value: Optional[datetime]) -> Optional[datetime]:
+        """An article date as naive UTC, comparable with datetime.utcnow()"""
+        if value and value.tzinfo:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
@@ -0,0 +1,128 @@
+"""
+Article metadata embedded in a page as schema.org JSON-LD and OpenGraph tags.
+
+Both are read with regular expressions straight from the raw HTML, so no
+DOM is built: the scrapers only fall back to BeautifulSoup for the fields
+these blocks leave out (usually the article body).
+"""
+
+import html as html_lib
+import json
+import re
+from typing import Any, Dict, Iterator, Optional
+
+ARTICLE_TYPES = {"NewsArticle", "Article", "ReportageNewsArticle", "AnalysisNewsArticle", "BlogPosting"}
+
+_JSON_LD_RE = re.compile(
+    r"<script[^>]*type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL
+)
+_META_RE = re.compile(r"<meta\s[^>]*>", re.IGNORECASE)
+_ATTR_RE = re.compile(r"([\w:-]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')")
+_HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
+
+
+def _clean(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = " ".join(html_lib.unescape(value).split())
+    return value or None
+
+
+def _iter_nodes(data: Any) -> Iterator[Dict]:
+    """Every object in a JSON-LD document, including those inside @graph"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_nodes(data["@graph"])
+
+
+def _is_article(node: Dict) -> bool:
+    types = node.get("@type")
+    if isinstance(types, str):
+        types = [types]
+    return bool(ARTICLE_TYPES.intersection(types or []))
+
+
+def _names(value: Any) -> Optional[str]:
+    """Author as a string, Person object or list of either"""
+    if isinstance(value, list):
+        names = [name for name in (_names(item) for item in value) if name]
+        return ", ".join(names) or None
+    if isinstance(value, dict):
+        return _clean(value.get("name"))
+    return _clean(value)
+
+
+def _image_url(value: Any) -> Optional[str]:
+    """Image as a URL, ImageObject or list of either"""
+    if isinstance(value, list):
+        return _image_url(value[0]) if value else None
+    if isinstance(value, dict):
+        return _clean(value.get("url") or value.get("contentUrl"))
+    return _clean(value)
+
+
+def _json_ld_article(html: str) -> Dict[str, Optional[str]]:
+    for match in _JSON_LD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        for node in _iter_nodes(data):
+            if _is_article(node):
+                return {
+                    "title": _clean(node.get("headline")),
+                    "summary": _clean(node.get("description")),
+                    "content": _clean(node.get("articleBody")),
+                    "author": _names(node.get("author")),
+                    "published_at": _clean(node.get("datePublished")),
+                    "image_url": _image_url(node.get("image")),
+                }
+    return {}
+
+
+def _meta_tags(html: str) -> Dict[str, str]:
+    """property/name -> content of the <meta> tags in <head>"""
+    head_end = _HEAD_END_RE.search(html)
+    head = html[:head_end.start()] if head_end else html
+
+    tags = {}
+    for tag in _META_RE.finditer(head):
+        attrs = {
+            name.lower(): double or single
+            for name, double, single in _ATTR_RE.findall(tag.group(0))
+        }
+        key = attrs.get("property") or attrs.get("name")
+        if key and "content" in attrs:
+            tags.setdefault(key.lower(), attrs["content"])
+    return tags
+
+
+def extract_structured(html: str) -> Dict[str, Optional[str]]:
+    """
+    Article fields from JSON-LD, completed with OpenGraph / article: meta
+    tags. Keys are those of extract_article; missing fields are None.
+    """
+    article = _json_ld_article(html)
+    meta = _meta_tags(html)
+    fallbacks = {
+        "title": meta.get("og:title"),
+        "summary": meta.get("og:description") or meta.get("description"),
+        "content": None,
+        # article:author is often a profile URL rather than a name
+        "author": next(
+            (value for value in (meta.get("article:author"), meta.get("author"))
+             if value and not value.startswith("http")),
+            None
+        ),
+        "published_at": meta.get("article:published_time"),
+        "image_url": meta.get("og:image"),
+    }
+    return {
+        field: article.get(field) or _clean(fallback)
+        for field, fallback in fallbacks.items()
+    }
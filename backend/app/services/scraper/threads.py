@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
+from .article import ScrapedArticle
 from .base import BaseScraper
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class ThreadsScraper(BaseScraper):
     def base_url(self) -> str:
         return "https://www.threads.net"
 
-    async def get_article_urls(self, search_term: str) -> List[str]:
+    async def get_article_urls(self, search_term: str, page: int = 1) -> List[str]:
         """
         Get Threads search results.
 
@@ -36,7 +37,7 @@ class ThreadsScraper(BaseScraper):
         )
         return []
 
-    async def parse_article(self, url: str) -> Optional[Dict]:
+    async def parse_article(self, url: str) -> Optional[ScrapedArticle]:
         """Parse a Threads post"""
         # Threads requires API access (not yet publicly available)
         return None
@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
+from .article import ScrapedArticle
 from .base import BaseScraper
 
 logger = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ class TwitterScraper(BaseScraper):
     def base_url(self) -> str:
         return "https://twitter.com"
 
-    async def get_article_urls(self, search_term: str) -> List[str]:
+    async def get_article_urls(self, search_term: str, page: int = 1) -> List[str]:
         """
         Get Twitter search results.
 
@@ -47,7 +48,7 @@ class TwitterScraper(BaseScraper):
         )
         return []
 
-    async def parse_article(self, url: str) -> Optional[Dict]:
+    async def parse_article(self, url: str) -> Optional[ScrapedArticle]:
         """Parse a Twitter post/thread"""
         # Twitter requires API access for reliable parsing
         return None
@@ -1,7 +1,21 @@
 import asyncio
 from celery import Celery
+from celery.signals import celeryd_init, worker_init
 from ..config import settings
 
+# Queues, each consumed by its own worker (see docker-compose.yml):
+# PRO terms get dedicated capacity, FREE terms and maintenance share
+# another worker, historical crawls run on a low-concurrency one.
+PRO_QUEUE = "scrape_pro"
+FREE_QUEUE = "scrape_free"
+BACKFILL_QUEUE = "backfill"
+
+
+def queue_for_plan(plan) -> str:
+    """Queue of a plan's scraping work (scheduled and on-demand)"""
+    return PRO_QUEUE if plan == "pro" else FREE_QUEUE
+
+
 # Celery configuration
 celery_app = Celery(
     "ecoa_tasks",
@@ -15,32 +29,126 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="America/Sao_Paulo",
     enable_utc=True,
+    # A worker consuming several queues (-Q scrape_free,celery) drains
+    # them in the order given, so scraping goes before maintenance
+    broker_transport_options={"queue_order_strategy": "priority"},
+    # Scraping jobs are long and acked late: a worker takes one message per
+    # free process, never reserving jobs behind a busy one
+    worker_prefetch_multiplier=1,
+    # Tasks routed to a queue nobody consumes wait there forever: every
+    # queue named here needs a worker in docker-compose.yml (the backfill
+    # queue is drained by celery-worker-backfill). On-demand scrapes pick
+    # their plan's queue when queued (queue_for_plan).
+    task_routes={
+        "app.tasks.scraping.deep_crawl_task": {"queue": BACKFILL_QUEUE},
+    },
     beat_schedule={
-        "scrape-news-every-30-minutes": {
-            "task": "app.tasks.scraping.scrape_news_task",
-            "schedule": settings.SCRAPE_INTERVAL_MINUTES * 60,  # Convert to seconds
+        "scrape-pro-terms": {
+            "task": "app.tasks.scraping.scrape_plan_task",
+            "schedule": settings.PRO_SCRAPE_INTERVAL_MINUTES * 60,  # Convert to seconds
+            "args": ("pro",),
+            "options": {"queue": PRO_QUEUE},
+        },
+        "scrape-free-terms": {
+            "task": "app.tasks.scraping.scrape_plan_task",
+            "schedule": settings.SCRAPE_INTERVAL_MINUTES * 60,
+            "args": ("free",),
+            "options": {"queue": FREE_QUEUE},
+        },
+        "reconcile-term-counters-daily": {
+            "task": "app.tasks.scraping.reconcile_term_counters_task",
+            "schedule": 24 * 60 * 60,
+        },
+        "prune-raw-html-daily": {
+            "task": "app.tasks.scraping.prune_raw_html_task",
+            "schedule": 24 * 60 * 60,
         },
     },
 )
 
 
-@celery_app.task(name="app.tasks.scraping.scrape_news_task")
-def scrape_news_task():
+@celeryd_init.connect
+def set_queue_concurrency(sender=None, conf=None, options=None, **kwargs):
+    """Size each worker's pool from Settings by the queues it consumes, unless --concurrency is given"""
+    queues = options.get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+
+    if PRO_QUEUE in queues:
+        concurrency = settings.SCRAPE_PRO_CONCURRENCY
+    elif FREE_QUEUE in queues:
+        concurrency = settings.SCRAPE_FREE_CONCURRENCY
+    elif BACKFILL_QUEUE in queues:
+        concurrency = settings.SCRAPE_BACKFILL_CONCURRENCY
+    else:
+        return
+
+    if not options.get("concurrency"):
+        conf.worker_concurrency = concurrency
+
+
+@worker_init.connect
+def check_shared_backends(**kwargs):
+    """
+    Workers store articles, and the API only learns about it through the
+    shared cache (ingest watermark) and event broker (SSE pushes). With the
+    in-process backends both signals would stay inside the worker, so
+    refuse to start.
+    """
+    if settings.CACHE_BACKEND != "redis":
+        raise RuntimeError(
+            f"CACHE_BACKEND={settings.CACHE_BACKEND!r} cannot be used with Celery workers: "
+            "set CACHE_BACKEND=redis so ingests invalidate the API's cache"
+        )
+    if settings.EVENTS_BACKEND != "redis":
+        raise RuntimeError(
+            f"EVENTS_BACKEND={settings.EVENTS_BACKEND!r} cannot be used with Celery workers: "
+            "set EVENTS_BACKEND=redis so new matches reach SSE subscribers"
+        )
+
+
+# acks_late: a worker killed mid-job leaves the message unacknowledged, so it
+# is delivered again and, owning the checkpoint by task id, resumes it at once
+@celery_app.task(
+    name="app.tasks.scraping.scrape_news_task",
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True
+)
+def scrape_news_task(self):
     """Celery task to run the news scraping job"""
     from ..services.news_processor import news_processor
 
     # Run async function in sync context
     loop = asyncio.get_event_loop()
-    result = loop.run_until_complete(news_processor.run_scraping_job())
+    result = loop.run_until_complete(news_processor.run_scraping_job(owner=self.request.id))
 
     return result
 
 
+@celery_app.task(
+    name="app.tasks.scraping.scrape_plan_task",
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True
+)
+def scrape_plan_task(self, plan: str):
+    """Celery task to run the scraping job for the terms of one plan ("pro" or "free")"""
+    from ..models import PlanType
+    from ..services.news_processor import news_processor
+
+    loop = asyncio.get_event_loop()
+    return loop.run_until_complete(news_processor.run_scraping_job(PlanType(plan), owner=self.request.id))
+
+
 @celery_app.task(name="app.tasks.scraping.scrape_term_task")
 def scrape_term_task(term: str):
     """Celery task to scrape news for a specific term"""
+    from ..services.fetch_health import host_health
     from ..services.news_processor import news_processor
 
+    # Circuits and latencies are per job (the worker process is reused)
+    host_health.reset()
     loop = asyncio.get_event_loop()
     articles = loop.run_until_complete(news_processor.scrape_all_sources([term]))
     stored = loop.run_until_complete(news_processor.process_and_store(articles))
@@ -48,5 +156,81 @@ def scrape_term_task(term: str):
     return {
         "term": term,
         "articles_found": len(articles),
-        "articles_stored": stored
+        "articles_stored": stored,
+        "hosts": host_health.report()
+    }
+
+
+@celery_app.task(name="app.tasks.scraping.scrape_pending_terms_task")
+def scrape_pending_terms_task(plan: str = "pro"):
+    """Celery task to scrape, in one batch, the terms one plan's users requested through request_term_scrape"""
+    from ..models import PlanType
+    from ..services.fetch_health import host_health
+    from ..services.news_processor import news_processor
+    from ..services.scrape_scheduler import claim_pending_terms, get_sync_client, release_terms
+
+    client = get_sync_client()
+    terms = claim_pending_terms(client, PlanType(plan))
+    if not terms:
+        return {"terms": [], "articles_found": 0, "articles_stored": 0}
+
+    # Circuits and latencies are per job (the worker process is reused)
+    host_health.reset()
+    try:
+        loop = asyncio.get_event_loop()
+        articles = loop.run_until_complete(news_processor.scrape_all_sources(terms))
+        stored = loop.run_until_complete(news_processor.process_and_store(articles))
+    finally:
+        release_terms(client, terms)
+
+    # The first page is in; older history follows on the backfill queue
+    deep_crawl_task.delay(terms)
+
+    return {
+        "terms": terms,
+        "articles_found": len(articles),
+        "articles_stored": stored,
+        "hosts": host_health.report()
     }
+
+
+@celery_app.task(name="app.tasks.scraping.deep_crawl_task")
+def deep_crawl_task(terms: list, max_pages: int = None, days: int = None):
+    """Celery task to crawl older search result pages for the given terms"""
+    from ..services.news_processor import news_processor
+
+    loop = asyncio.get_event_loop()
+    return loop.run_until_complete(news_processor.run_deep_crawl(terms, max_pages, days))
+
+
+@celery_app.task(name="app.tasks.scraping.reconcile_term_counters_task")
+def reconcile_term_counters_task():
+    """Celery task to repair the denormalized match counters on monitored terms"""
+    from ..services.news_processor import news_processor
+
+    return {"terms_fixed": news_processor.reconcile_term_counters()}
+
+
+@celery_app.task(bind=True, name="app.tasks.scraping.backfill_term_task")
+def backfill_term_task(self, term_id: str):
+    """Celery task to match a new or renamed term against stored news"""
+    from ..services.cache import response_cache
+    from ..services.news_processor import news_processor
+
+    def report(status: dict):
+        self.update_state(state="PROGRESS", meta=status)
+
+    result = news_processor.backfill_term_matches(term_id, progress=report)
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(response_cache.mark_ingest())
+
+    return result
+
+
+@celery_app.task(name="app.tasks.scraping.prune_raw_html_task")
+def prune_raw_html_task():
+    """Celery task to apply the retention policy of the raw HTML store"""
+    from ..services.raw_store import raw_html_store
+
+    return {"files_removed": raw_html_store.prune(settings.RAW_HTML_RETENTION_DAYS)}
@@ -45,6 +45,7 @@ CREATE TABLE IF NOT EXISTS ecoa_news (
     scraped_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     sentiment ENUM('positive', 'negative', 'neutral'),
     sentiment_score FLOAT,
+    raw_html_hash VARCHAR(64),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     INDEX idx_news_source (source),
     INDEX idx_news_published (published_at),
@@ -58,6 +59,8 @@ CREATE TABLE IF NOT EXISTS ecoa_monitored_terms (
     user_id VARCHAR(36) NOT NULL,
     term VARCHAR(255) NOT NULL,
     is_active BOOLEAN DEFAULT TRUE,
+    match_total INT NOT NULL DEFAULT 0,
+    last_matched_at DATETIME,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     UNIQUE KEY uq_user_term (user_id, term),
@@ -76,6 +79,7 @@ CREATE TABLE IF NOT EXISTS ecoa_news_term_matches (
     UNIQUE KEY uq_news_term (news_id, term_id),
     INDEX idx_match_news (news_id),
     INDEX idx_match_term (term_id),
+    INDEX idx_match_term_created (term_id, created_at),
     FOREIGN KEY (news_id) REFERENCES ecoa_news(id) ON DELETE CASCADE,
     FOREIGN KEY (term_id) REFERENCES ecoa_monitored_terms(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -100,6 +104,40 @@ CREATE TABLE IF NOT EXISTS ecoa_alerts (
     FOREIGN KEY (news_id) REFERENCES ecoa_news(id) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Crawl yield per (source, term), used to budget the scraping job
+CREATE TABLE IF NOT EXISTS ecoa_crawl_stats (
+    id VARCHAR(36) PRIMARY KEY,
+    source VARCHAR(50) NOT NULL,
+    term VARCHAR(255) NOT NULL,
+    yield_avg FLOAT NOT NULL DEFAULT 0,
+    last_new_count INT NOT NULL DEFAULT 0,
+    quiet_runs INT NOT NULL DEFAULT 0,
+    last_crawled_at DATETIME,
+    next_crawl_at DATETIME,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_crawl_source_term (source, term)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Scraping job checkpoints (resume after a worker is killed)
+CREATE TABLE IF NOT EXISTS ecoa_scrape_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    job_key VARCHAR(50) NOT NULL,
+    running_key VARCHAR(50),
+    status ENUM('running', 'completed') NOT NULL DEFAULT 'running',
+    owner VARCHAR(155),
+    heartbeat_at DATETIME,
+    done_units JSON NOT NULL,
+    pending_articles JSON NOT NULL,
+    articles_found INT NOT NULL DEFAULT 0,
+    articles_stored INT NOT NULL DEFAULT 0,
+    attempts INT NOT NULL DEFAULT 1,
+    started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    finished_at DATETIME,
+    INDEX idx_scrape_job_key_status (job_key, status),
+    UNIQUE KEY uq_scrape_job_running_key (running_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Insert default news sources
 INSERT INTO ecoa_news_sources (id, name, slug, base_url, scraper_type, is_active) VALUES
     (UUID(), 'G1', 'g1', 'https://g1.globo.com', 'g1', TRUE),
@@ -107,3 +145,18 @@ INSERT INTO ecoa_news_sources (id, name, slug, base_url, scraper_type, is_active
     (UUID(), 'Twitter/X', 'twitter', 'https://twitter.com', 'twitter', TRUE),
     (UUID(), 'Threads', 'threads', 'https://threads.net', 'threads', TRUE)
 ON DUPLICATE KEY UPDATE name = VALUES(name);
+
+-- Migrações para bancos já existentes (CREATE TABLE IF NOT EXISTS não altera
+-- tabelas criadas antes). Execute manualmente apenas as que ainda não foram aplicadas.
+-- ALTER TABLE ecoa_news_term_matches ADD INDEX idx_match_term_created (term_id, created_at);
+-- ALTER TABLE ecoa_monitored_terms ADD COLUMN match_total INT NOT NULL DEFAULT 0, ADD COLUMN last_matched_at DATETIME;
+-- Em seguida preencha os contadores a partir das correspondências já gravadas
+-- (o mesmo cálculo de reconcile_term_counters_task, que também os corrige depois):
+-- UPDATE ecoa_monitored_terms t SET
+--     t.match_total = (SELECT COUNT(*) FROM ecoa_news_term_matches m WHERE m.term_id = t.id),
+--     t.last_matched_at = (SELECT MAX(m.created_at) FROM ecoa_news_term_matches m WHERE m.term_id = t.id),
+--     t.updated_at = t.updated_at;
+-- ALTER TABLE ecoa_news ADD COLUMN raw_html_hash VARCHAR(64);
+-- ALTER TABLE ecoa_scrape_jobs ADD COLUMN running_key VARCHAR(50), ADD COLUMN owner VARCHAR(155), ADD COLUMN heartbeat_at DATETIME, ADD UNIQUE KEY uq_scrape_job_running_key (running_key);
+-- (com mais de um job 'running' na mesma chave, marque os mais antigos como 'completed' antes)
+-- UPDATE ecoa_scrape_jobs SET running_key = job_key, heartbeat_at = updated_at WHERE status = 'running';
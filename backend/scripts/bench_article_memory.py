@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de memória dos artigos coletados num job de scraping
+Execute: python -m scripts.bench_article_memory [--articles 10000]
+
+Compara, para os mesmos textos:
+  1. dicts com datas em ISO (formato antigo), convertidos de volta com
+     fromisoformat e com o hash da URL calculado na hora de gravar
+  2. registros ScrapedArticle (dataclass com slots, datas já tipadas e url_hash)
+
+A memória medida é a das estruturas de cada artigo: os textos (título,
+conteúdo etc.) são gerados antes e compartilhados pelos dois formatos.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.scraper import ScrapedArticle
+from app.services.scraper.article import get_url_hash, parse_iso_datetime
+
+
+def build_payloads(count: int) -> List[Tuple]:
+    """Gera textos sintéticos com tamanhos próximos aos reais"""
+    published = datetime(2024, 5, 1, 13, 30, tzinfo=timezone(timedelta(hours=-3)))
+    payloads = []
+    for i in range(count):
+        payloads.append((
+            f"https://g1.globo.com/politica/noticia/2024/05/01/noticia-{i}.ghtml",
+            f"Notícia {i}: governo anuncia novo pacote de medidas econômicas",
+            "resumo da notícia " * 12 + str(i),
+            ("conteúdo da notícia " * 250)[:5000] + str(i),
+            "Redação",
+            f"https://s2.glbimg.com/imagem-{i}.jpg",
+            published - timedelta(minutes=i),
+            f"{i:064x}",
+        ))
+    return payloads
+
+
+def as_dicts(payloads: List[Tuple]) -> List[dict]:
+    articles = []
+    for url, title, summary, content, author, image_url, published_at, raw_hash in payloads:
+        articles.append({
+            "title": title,
+            "summary": summary,
+            "content": content,
+            "url": url,
+            "image_url": image_url,
+            "author": author,
+            "published_at": published_at.isoformat(),
+            "raw_html_hash": raw_hash,
+            "source": "g1",
+            "scraped_at": datetime.utcnow().isoformat(),
+            "term": "governo",
+        })
+    return articles
+
+
+def as_records(payloads: List[Tuple]) -> List[ScrapedArticle]:
+    articles = []
+    for url, title, summary, content, author, image_url, published_at, raw_hash in payloads:
+        articles.append(ScrapedArticle(
+            url=url,
+            title=title,
+            source="g1",
+            summary=summary,
+            content=content,
+            author=author,
+            image_url=image_url,
+            published_at=published_at,
+            raw_html_hash=raw_hash,
+            term="governo",
+        ))
+    return articles
+
+
+def store_dicts(articles: List[dict]) -> None:
+    """What process_and_store derived from each dict before writing it"""
+    for article in articles:
+        get_url_hash(article["url"])
+        parse_iso_datetime(article["published_at"])
+        datetime.utcnow()
+
+
+def store_records(articles: List[ScrapedArticle]) -> None:
+    for article in articles:
+        article.url_hash
+        article.published_at
+        article.scraped_at
+
+
+def measure(label: str, build: Callable, store: Callable, payloads: List[Tuple]) -> Tuple[int, float]:
+    start = time.perf_counter()
+    articles = build(payloads)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store(articles)
+    stored = time.perf_counter() - start
+    del articles
+
+    # Memory on a second, traced build (tracing slows it down)
+    tracemalloc.start()
+    articles = build(payloads)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<26}{size / 1024 / 1024:>8.2f} MB{size / len(payloads):>8.0f} B"
+        f"{built * 1000:>11.1f} ms{stored * 1000:>11.1f} ms"
+    )
+    return size, built + stored
+
+
+def main(args) -> int:
+    payloads = build_payloads(args.articles)
+    text_mb = sum(len(text.encode("utf-8")) for payload in payloads for text in payload[:6]) / 1024 / 1024
+
+    print("=" * 72)
+    print(f"ECOA - Memória de {args.articles} artigos (textos compartilhados: {text_mb:.1f} MB)")
+    print("=" * 72)
+    print(f"{'':<26}{'estruturas':>11}{'/artigo':>10}{'criação':>14}{'gravação':>14}")
+    dict_size, dict_time = measure("dicts + datas ISO", as_dicts, store_dicts, payloads)
+    record_size, record_time = measure("ScrapedArticle (slots)", as_records, store_records, payloads)
+    print("-" * 72)
+    print(
+        f"{dict_size / record_size:.1f}x menos memória e {dict_time / record_time:.1f}x menos tempo "
+        f"por artigo fora dos textos"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de memória dos artigos coletados")
+    parser.add_argument("--articles", type=int, default=10000)
+    sys.exit(main(parser.parse_args()))
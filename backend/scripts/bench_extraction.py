@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark da extração de notícias a partir do HTML
+Execute: python -m scripts.bench_extraction [--rounds 50] [--from-store 200]
+
+Compara, para as mesmas páginas:
+  1. DOM completo + seletores CSS (extract_from_dom, o caminho antigo)
+  2. JSON-LD / OpenGraph primeiro, DOM só para o que faltar (extract_article)
+
+Por padrão usa páginas sintéticas no formato do G1 e da CNN; com --from-store
+usa páginas reais do HTML bruto guardado (requer banco e RAW_HTML_STORE_DIR).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.scraper import G1Scraper, CNNScraper, ScrapedArticle
+from app.services.scraper.base import ARTICLE_FIELDS, MAX_CONTENT_LENGTH
+
+SCRAPERS = {
+    "g1": G1Scraper(),
+    "cnn": CNNScraper(),
+}
+
+# Class names and header markup of each source's article pages
+LAYOUTS = {
+    "g1": {
+        "title": "content-head__title",
+        "subtitle": "content-head__subtitle",
+        "body": "mc-column mc-article-body",
+        "author": "content-publication-data__from",
+        "byline": "Por Redação",
+        "url": "https://g1.globo.com/politica/noticia/2024/05/01/noticia-{i}.ghtml",
+    },
+    "cnn": {
+        "title": "post__title",
+        "subtitle": "post__excerpt",
+        "body": "post__content",
+        "author": "author__name",
+        "byline": "Redação",
+        "url": "https://www.cnnbrasil.com.br/politica/noticia-{i}/",
+    },
+}
+
+
+def build_page(source: str, i: int) -> Tuple[str, str]:
+    """Gera uma página sintética com tamanho e estrutura próximos aos reais"""
+    layout = LAYOUTS[source]
+    url = layout["url"].format(i=i)
+    title = f"Notícia {i}: governo anuncia novo pacote de medidas econômicas"
+    summary = "Resumo da notícia com os principais pontos do anúncio " * 3
+    json_ld = {
+        "@context": "https://schema.org",
+        "@type": "NewsArticle",
+        "headline": title,
+        "description": summary,
+        "datePublished": "2024-05-01T10:30:00-03:00",
+        "author": [{"@type": "Person", "name": "Redação"}],
+        "image": {"@type": "ImageObject", "url": f"https://img.example/{source}-{i}.jpg"},
+    }
+    meta = "".join(f'<meta name="tag-{n}" content="valor {n}">' for n in range(40))
+    scripts = "".join(f"<script>window.cfg{n} = {{a: {n}}};</script>" for n in range(30))
+    nav = "".join(
+        f'<li class="menu-item"><a href="/secao-{n}"><span>Seção {n}</span></a></li>' for n in range(400)
+    )
+    paragraphs = "".join(
+        f'<p class="content-text__container">Parágrafo {n} da notícia {i}, ' + "com texto corrido " * 20 + "</p>"
+        f'<div class="ad-slot"><div class="ad"><iframe src="about:blank"></iframe></div></div>'
+        for n in range(25)
+    )
+    related = "".join(
+        f'<div class="feed-post"><a href="/noticia-{n}"><img src="/t{n}.jpg"><h2>Relacionada {n}</h2></a></div>'
+        for n in range(150)
+    )
+    page = (
+        f"<!DOCTYPE html><html lang=\"pt-BR\"><head><title>{title}</title>"
+        f'<meta property="og:title" content="{title}">'
+        f'<meta property="og:description" content="{summary}">'
+        f'<meta property="og:image" content="https://img.example/{source}-{i}.jpg">'
+        f'<meta property="article:published_time" content="2024-05-01T13:30:00Z">'
+        f"{meta}{scripts}"
+        f'<script type="application/ld+json">{json.dumps(json_ld, ensure_ascii=False)}</script>'
+        f"</head><body><header><nav><ul>{nav}</ul></nav></header><main>"
+        f'<h1 class="{layout["title"]}">{title}</h1>'
+        f'<h2 class="{layout["subtitle"]}">{summary}</h2>'
+        f'<p class="{layout["author"]}">{layout["byline"]}</p>'
+        f'<time datetime="2024-05-01T13:30:00Z">01/05/2024</time>'
+        f'<figure><img src="https://img.example/{source}-{i}.jpg"></figure>'
+        f'<article><div class="{layout["body"]}">{paragraphs}</div></article>'
+        f"<aside>{related}</aside></main><footer>{nav}</footer></body></html>"
+    )
+    return url, page
+
+
+def synthetic_pages(count: int) -> List[Tuple[str, str, str]]:
+    return [(source, *build_page(source, i)) for i in range(count) for source in SCRAPERS]
+
+
+def stored_pages(limit: int) -> List[Tuple[str, str, str]]:
+    from sqlalchemy import select
+
+    from app.database import SessionLocal
+    from app.models import News
+    from app.services.raw_store import raw_html_store
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(News.source, News.url, News.raw_html_hash)
+            .where(News.raw_html_hash.isnot(None), News.source.in_(list(SCRAPERS)))
+            .order_by(News.scraped_at.desc())
+            .limit(limit)
+        ).all()
+    finally:
+        db.close()
+
+    pages = []
+    for source, url, digest in rows:
+        html = raw_html_store.get(digest)
+        if html:
+            pages.append((source, url, html))
+    return pages
+
+
+def dom_only(source: str, url: str, html: str) -> dict:
+    scraper = SCRAPERS[source]
+    article = scraper.extract_from_dom(scraper.parse_html(html), url)
+    if article.get("content"):
+        article["content"] = article["content"][:MAX_CONTENT_LENGTH]
+    return article
+
+
+def structured_first(source: str, url: str, html: str) -> Optional[ScrapedArticle]:
+    return SCRAPERS[source].extract_article(html, url)
+
+
+def measure(label: str, fn, pages, rounds: int) -> float:
+    for page in pages[:2]:
+        fn(*page)  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            fn(*page)
+    elapsed = (time.perf_counter() - start) / (rounds * len(pages))
+    print(f"{label:<45}{elapsed * 1000:>10.3f} ms/página")
+    return elapsed
+
+
+def main(args) -> int:
+    pages = stored_pages(args.from_store) if args.from_store else synthetic_pages(args.pages)
+    if not pages:
+        print("Nenhuma página encontrada")
+        return 1
+
+    size_kb = sum(len(html) for _, _, html in pages) / len(pages) / 1024
+    print("=" * 70)
+    print(f"ECOA - Extração de notícias ({len(pages)} páginas, média {size_kb:.0f} KB)")
+    print("=" * 70)
+    baseline = measure("DOM completo + seletores", dom_only, pages, args.rounds)
+    fast = measure("JSON-LD/OpenGraph + DOM só do que faltar", structured_first, pages, args.rounds)
+    print("-" * 70)
+    print(f"{baseline / fast:.1f}x mais rápido que o caminho antigo")
+
+    # Fields that differ between the two paths, as a sanity check (the DOM
+    # path leaves dates unnormalized, so they are not compared)
+    differences = {field: 0 for field in ARTICLE_FIELDS if field != "published_at"}
+    for page in pages:
+        old, new = dom_only(*page), structured_first(*page)
+        for field in differences:
+            if (old.get(field) or None) != (getattr(new, field, None) or None):
+                differences[field] += 1
+    print("Campos diferentes entre os caminhos: " + ", ".join(
+        f"{field}={count}" for field, count in differences.items()
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da extração de notícias")
+    parser.add_argument("--pages", type=int, default=10, help="Páginas sintéticas por fonte")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--from-store", type=int, metavar="N", help="Usa as N páginas guardadas mais recentes")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark do custo de serialização de uma página de /news
+Execute: python -m scripts.bench_serialization [--per-page 100] [--rounds 500]
+
+Compara, para a mesma página de itens:
+  1. objetos NewsResponse + jsonable_encoder + json.dumps (caminho padrão do FastAPI)
+  2. validação em lote com TypeAdapter + dump_json do Pydantic
+  3. dicts montados direto das linhas + orjson (FastJSONResponse)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.responses import FastJSONResponse
+from app.schemas.news import NewsResponse, NewsListResponse
+
+
+def build_rows(per_page: int, with_content: bool) -> List[dict]:
+    """Gera linhas sintéticas com tamanhos próximos aos reais"""
+    now = datetime.utcnow()
+    rows = []
+    for i in range(per_page):
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "title": f"Notícia {i}: " + "título de exemplo " * 6,
+            "summary": "resumo da notícia " * 18,
+            "content": ("conteúdo da notícia " * 250) if with_content else None,
+            "url": f"https://g1.globo.com/politica/noticia/2024/01/01/noticia-{i}.ghtml",
+            "image_url": f"https://s2.glbimg.com/imagem-{i}.jpg",
+            "author": "Redação",
+            "source": "g1",
+            "published_at": now - timedelta(minutes=i),
+            "sentiment": "neutral",
+            "sentiment_score": 0.05,
+            "scraped_at": now,
+            "matched_terms": ["lula", "haddad"],
+            "match_count": 3,
+        })
+    return rows
+
+
+def page(items) -> dict:
+    return {"items": items, "total": 1000, "page": 1, "per_page": len(items), "total_pages": 10}
+
+
+def pydantic_default(rows: List[dict]) -> bytes:
+    items = [NewsResponse(**row) for row in rows]
+    response = NewsListResponse(**page(items))
+    return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+
+def pydantic_type_adapter(rows: List[dict], adapter: TypeAdapter) -> bytes:
+    return adapter.dump_json(adapter.validate_python(page(rows)))
+
+
+def orjson_dicts(rows: List[dict], response: FastJSONResponse) -> bytes:
+    return response.render(page(rows))
+
+
+def measure(label: str, fn, rounds: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = fn()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{label:<40}{elapsed * 1000:>10.3f} ms/página{len(body) / 1024:>10.1f} KB")
+    return elapsed
+
+
+def main(args) -> int:
+    rows = build_rows(args.per_page, args.with_content)
+    adapter = TypeAdapter(NewsListResponse)
+    response = FastJSONResponse.__new__(FastJSONResponse)
+
+    print("=" * 70)
+    print(f"ECOA - Serialização de /news (per_page={args.per_page}, content={args.with_content})")
+    print("=" * 70)
+    baseline = measure("NewsResponse + jsonable_encoder", lambda: pydantic_default(rows), args.rounds)
+    adapted = measure("TypeAdapter (validação em lote)", lambda: pydantic_type_adapter(rows, adapter), args.rounds)
+    fast = measure("dicts + orjson", lambda: orjson_dicts(rows, response), args.rounds)
+    print("-" * 70)
+    print(f"TypeAdapter: {baseline / adapted:.1f}x   orjson: {baseline / fast:.1f}x mais rápido que o padrão")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialização de /news")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--with-content", action="store_true", help="Inclui o campo content (?fields=content)")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da API do ECOA: mede a vazão com requisições concorrentes
+Execute: python -m scripts.load_test --email admin@ecoa.com.br --password Admin@123456
+
+Para comparar antes/depois de uma mudança, rode o script contra cada versão
+da API com os mesmos parâmetros (mesmo banco, mesma concorrência) e compare
+as linhas de resultado.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+DEFAULT_ENDPOINTS = ["/dashboard", "/news?per_page=20", "/filters", "/auth/me"]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    deadline: float,
+    latencies: list,
+    errors: list
+):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(endpoint)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+            else:
+                latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: str, concurrency: int, duration: float) -> dict:
+    latencies: list = []
+    errors: list = []
+    deadline = time.perf_counter() + duration
+
+    await asyncio.gather(*[
+        worker(client, endpoint, deadline, latencies, errors)
+        for _ in range(concurrency)
+    ])
+
+    ordered = sorted(latencies)
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(ordered) * 1000 if ordered else 0.0,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1] * 1000 if ordered else 0.0,
+    }
+
+
+async def main(args) -> int:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60.0, limits=limits) as client:
+        token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        print("=" * 78)
+        print(f"ECOA - Teste de carga [{args.label}] concorrência={args.concurrency} duração={args.duration}s")
+        print("=" * 78)
+        print(f"{'endpoint':<28}{'reqs':>8}{'erros':>8}{'req/s':>10}{'p50 ms':>12}{'p95 ms':>12}")
+
+        for endpoint in args.endpoints:
+            result = await run_endpoint(client, endpoint, args.concurrency, args.duration)
+            print(
+                f"{result['endpoint']:<28}{result['requests']:>8}{result['errors']:>8}"
+                f"{result['rps']:>10.1f}{result['p50_ms']:>12.1f}{result['p95_ms']:>12.1f}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga da API do ECOA")
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--label", default="atual", help="Rótulo da execução (ex.: antes, depois)")
+    parser.add_argument("endpoints", nargs="*", default=DEFAULT_ENDPOINTS)
+    sys.exit(asyncio.run(main(parser.parse_args())))
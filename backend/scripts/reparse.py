@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Re-extrai notícias a partir do HTML bruto guardado, sem acessar a rede
+Execute: python -m scripts.reparse [--source g1] [--since 2024-01-01] [--workers 4] [--dry-run]
+
+Útil quando o G1 ou a CNN mudam o layout: corrija os seletores em
+extract_from_dom e rode este script para atualizar as notícias já salvas
+(título, resumo, conteúdo, autor, data, imagem e sentimento). Só são gravados
+os campos que a nova extração encontrou; os demais ficam como estão. As
+páginas são processadas em paralelo num pool de processos.
+
+Notícias cujo título ou conteúdo mudou são comparadas de novo com os termos
+ativos: correspondências novas são criadas, as que deixaram de existir são
+removidas, e os contadores dos termos são recalculados ao final. Por fim, o
+cache de respostas é invalidado, como após uma coleta.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select, update
+
+from app.database import SessionLocal
+from app.models import News, NewsTermMatch, SentimentType
+from app.services.cache import response_cache
+from app.services.news_processor import count_term_occurrences, news_processor
+from app.services.raw_store import raw_html_store
+from app.services.scraper import G1Scraper, CNNScraper
+from app.services.sentiment import analyze_news_sentiment
+
+SCRAPERS = {
+    "g1": G1Scraper(),
+    "cnn": CNNScraper(),
+}
+
+
+def reparse_one(item: Tuple) -> Tuple[str, Optional[Dict], str]:
+    """
+    Runs in a worker process: extract one stored page. Returns (id, fields,
+    status), fields holding only what the extraction found.
+    """
+    news_id, source, url, digest, title, content = item
+
+    html = raw_html_store.get(digest)
+    if html is None:
+        return news_id, None, "missing"
+
+    article = SCRAPERS[source].extract_article(html, url)
+    if not article:
+        return news_id, None, "failed"
+
+    # A field the new selectors missed keeps its stored value
+    fields = {
+        "title": article.title,
+        "summary": article.summary,
+        "content": article.content,
+        "author": article.author,
+        "image_url": article.image_url,
+        "published_at": article.published_at,
+    }
+    fields = {name: value for name, value in fields.items() if value is not None}
+
+    sentiment, sentiment_score = analyze_news_sentiment(
+        fields.get("title", title), fields.get("content", content)
+    )
+    if sentiment:
+        fields["sentiment"] = SentimentType(sentiment)
+        fields["sentiment_score"] = sentiment_score
+
+    fields["id"] = news_id
+    return news_id, fields, "ok"
+
+
+def write_updates(db, updates: List[Dict]) -> None:
+    """Bulk update by primary key, one statement per set of fields present"""
+    by_fields: Dict[frozenset, List[Dict]] = {}
+    for fields in updates:
+        by_fields.setdefault(frozenset(fields), []).append(fields)
+    for rows in by_fields.values():
+        db.execute(update(News), rows)
+
+
+def rematch_terms(db, terms: List, texts: Dict[str, Tuple[Optional[str], Optional[str]]]) -> int:
+    """
+    Match news whose text changed against the active terms again, adding,
+    updating and removing their matches. Returns the number of matches changed.
+    """
+    if not terms or not texts:
+        return 0
+    term_ids = [term.id for term in terms]
+
+    existing = {
+        (row.news_id, row.term_id): row
+        for row in db.execute(
+            select(NewsTermMatch.id, NewsTermMatch.news_id, NewsTermMatch.term_id, NewsTermMatch.match_count).where(
+                NewsTermMatch.news_id.in_(list(texts)),
+                NewsTermMatch.term_id.in_(term_ids)
+            )
+        )
+    }
+
+    added, counted = [], []
+    for news_id, (title, content) in texts.items():
+        for term in terms:
+            count = count_term_occurrences(term.term, title, content)
+            if not count:
+                continue
+            match = existing.pop((news_id, term.id), None)
+            if match is None:
+                added.append({"news_id": news_id, "term_id": term.id, "match_count": count})
+            elif match.match_count != count:
+                counted.append({"id": match.id, "match_count": count})
+    # Whatever is left in existing no longer matches
+    removed = [match.id for match in existing.values()]
+
+    if added:
+        db.execute(insert(NewsTermMatch), added)
+    if counted:
+        db.execute(update(NewsTermMatch), counted)
+    if removed:
+        db.execute(delete(NewsTermMatch).where(NewsTermMatch.id.in_(removed)))
+    return len(added) + len(counted) + len(removed)
+
+
+def main(args) -> int:
+    sources = [args.source] if args.source else list(SCRAPERS)
+
+    query = select(News.id, News.source, News.url, News.raw_html_hash, News.title, News.content).where(
+        News.raw_html_hash.isnot(None),
+        News.source.in_(sources)
+    )
+    if args.since:
+        query = query.where(News.scraped_at >= datetime.fromisoformat(args.since))
+
+    print("=" * 60)
+    print(f"ECOA - Reprocessamento de HTML bruto (fontes: {', '.join(sources)})")
+    print("=" * 60)
+
+    db = SessionLocal()
+    counts = {"ok": 0, "missing": 0, "failed": 0}
+    rematched = 0
+    last_id = ""
+
+    try:
+        terms = news_processor.get_active_term_rows(db)
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            while True:
+                chunk = db.execute(
+                    query.where(News.id > last_id).order_by(News.id).limit(args.chunk_size)
+                ).all()
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+
+                stored = {row.id: (row.title, row.content) for row in chunk}
+                updates = []
+                changed_texts = {}
+                for news_id, fields, status in pool.map(reparse_one, [tuple(row) for row in chunk], chunksize=16):
+                    counts[status] += 1
+                    if not fields:
+                        continue
+                    updates.append(fields)
+                    title, content = stored[news_id]
+                    text = (fields.get("title", title), fields.get("content", content))
+                    if text != (title, content):
+                        changed_texts[news_id] = text
+
+                if updates and not args.dry_run:
+                    write_updates(db, updates)
+                    rematched += rematch_terms(db, terms, changed_texts)
+                    db.commit()
+
+                print(f"  {sum(counts.values())} notícias processadas...")
+    finally:
+        db.close()
+
+    if rematched:
+        # Counters are derived from the match table, so recompute them once
+        news_processor.reconcile_term_counters()
+
+    # Cached dashboards and the clients' ETags describe the old extraction
+    if counts["ok"] and not args.dry_run:
+        asyncio.run(response_cache.mark_ingest())
+
+    print(f"\nAtualizadas: {counts['ok']}{' (dry-run, nada gravado)' if args.dry_run else ''}")
+    print(f"Correspondências com termos alteradas: {rematched}")
+    print(f"Sem HTML guardado: {counts['missing']}")
+    print(f"Falha na extração: {counts['failed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-extrai notícias a partir do HTML bruto guardado")
+    parser.add_argument("--source", choices=list(SCRAPERS), help="Apenas uma fonte")
+    parser.add_argument("--since", help="Apenas notícias coletadas a partir desta data (AAAA-MM-DD)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Extrai, mas não grava no banco")
+    sys.exit(main(parser.parse_args()))
@@ -21,6 +21,7 @@ interface FilterItem {
   is_active: boolean;
   created_at: string;
   match_count: number;
+  last_matched_at: string | null;
 }
 
 interface FiltersResponse {
@@ -26,6 +26,7 @@ interface News {
   sentiment: string | null;
   published_at: string | null;
   matched_terms: string[];
+  match_count: number;
 }
 
 interface NewsResponse {